@@ -1,30 +1,307 @@
 import os
+import sys
 import time
-from dotenv import load_dotenv
-from services.ai_checker import process_files
-from services.markdown_parser import extract_frontmatter
-from services.markdown_to_json import extract_markdown_structure, save_combined_json, file_exists_for
-from utils.logger import log_processing_result, log_error, logger, log_file_result
+import signal
+from collections import Counter
+from services.ai_checker import iter_ai_documents, iter_ai_paths
+from services.manifest import Manifest
+from services.ai_index import AiFlagIndex
+from services.markdown_to_json import VALIDATION_MODES, OUTPUT_LAYOUTS, get_validator
+from services.converter import convert_document, convert_batch
+from services.pipeline import run_bounded, AdaptiveLimit
+from services.sinks import JsonFileSink, JsonlSink
+from services.frontmatter_cache import frontmatter_cache
+from services.discovery import PathFilter, is_empty_folder
+from utils.logger import log_processing_result, log_error, logger, log_file_result, flush_logs, phase_timings, log_phase_timings, setup_logging
+from utils.profiler import profiler
 import argparse
+import importlib
 from services.cli_help import print_help
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-load_dotenv()
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 NOTES_FOLDER = os.getenv("NOTES_FOLDER")
 OUTPUT_FOLDER = os.getenv("OUTPUT_FOLDER")
 
-def set_env_vars(env, trigger):
+def load_env():
+    """Read .env (python-dotenv), deferred until a command needs the folders: --help skips it."""
+    global NOTES_FOLDER, OUTPUT_FOLDER
+    from dotenv import load_dotenv
+    load_dotenv()
+    NOTES_FOLDER = os.getenv("NOTES_FOLDER")
+    OUTPUT_FOLDER = os.getenv("OUTPUT_FOLDER")
+
+def set_env_vars(env, trigger, validate="all"):
     os.environ["ENV"] = env
     os.environ["TRIGGER"] = trigger
+    os.environ["VALIDATE"] = validate
+
+def is_unchanged(md, doc, sink, manifest, args, indexes=()):
+    json_path = sink.target_for(md)
+    if not args.overwrite and manifest.is_unchanged(md, json_path, doc):
+        # A note missing from an index (new index, or deleted database) is converted again to fill it
+        sha256 = manifest.get(md)["sha256"]
+        if not all(index.is_current(md, sha256) for index in indexes):
+            return False
+        sink.keep(md)
+        log_file_result(md, "unchanged")
+        return True
+    return False
+
+def update_indexes(indexes, manifest, md, combined):
+    entry = manifest.get(md)
+    if combined is None or entry is None:
+        return
+    for index in indexes:
+        index.update(md, combined, entry["sha256"])
+
+def default_workers(executor):
+    """What the standard library would pick for the executor ('thread' or 'process') without max_workers."""
+    cpus = getattr(os, "process_cpu_count", os.cpu_count)() or 1
+    if executor == "thread":
+        return min(32, cpus + 4)
+    # ProcessPoolExecutor refuses more than 61 workers on Windows
+    return min(61, cpus) if sys.platform == "win32" else cpus
+
+def max_inflight(args, workers):
+    # Bound between the scan and the workers: notes (threads) or batches (processes) not yet handled
+    return args.queue_size or 4 * workers
+
+def run_threaded(documents, failed, manifest, sink, args, indexes=()):
+    counts = Counter()
+    def process_file(doc):
+        # The note was loaded once during the scan, every stage below shares it
+        md = doc.path
+        with doc:
+            if is_unchanged(md, doc, sink, manifest, args, indexes):
+                return md, "unchanged", None
+            # Indexes need the whole note, so big notes are only streamed without them
+            json_path, status, combined = convert_document(doc, sink, stream=not indexes)
+            if json_path:
+                if not args.dry_run:
+                    manifest.record(md, json_path, doc)
+                log_file_result(md, "converted")
+            return md, status, combined
+    def handle(result):
+        md, status, combined = result
+        counts[status] += 1
+        if status == "failed" and failed is not None:
+            failed.append(md)
+        # Indexes are written from this thread only, the workers just hand over the note
+        update_indexes(indexes, manifest, md, combined)
+    workers = args.workers or default_workers("thread")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        run_bounded(executor, partial(profiler.call, process_file), documents, max_inflight(args, workers), handle)
+    return counts
+
+def run_process_pool(documents, failed, manifest, sink, args, indexes=()):
+    # Pulls in multiprocessing, thread runs don't pay for it
+    from concurrent.futures import ProcessPoolExecutor
+    counts = Counter()
+    # Compiled before the pool starts, so forked workers inherit the validator
+    get_validator()
+    def batches():
+        # Unchanged notes are settled here with the scan's documents, workers only get real work
+        batch = []
+        for doc in documents:
+            md = doc.path
+            with doc:
+                if is_unchanged(md, doc, sink, manifest, args, indexes):
+                    counts["unchanged"] += 1
+                    continue
+            # The worker gets the note as read here; a memory-mapped one can't be pickled, it maps it again
+            batch.append(md if doc.mapped else doc)
+            if len(batch) >= args.chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    def handle(batch):
+        results, cache_updates = batch
+        frontmatter_cache.merge(cache_updates)
+        for result in results:
+            phase_timings.merge(result["path"], result["timings"])
+            if result["payload"] is not None:
+                sink.append(result["path"], result["payload"])
+            if result["entry"]:
+                manifest.record_entry(result["path"], result["entry"])
+            update_indexes(indexes, manifest, result["path"], result["combined"])
+            counts[result["status"]] += 1
+            if result["status"] == "failed" and failed is not None:
+                failed.append(result["path"])
+    # Forked workers inherit the log writer, spawned ones (macOS, Windows) start their own
+    workers = args.workers or default_workers("process")
+    with ProcessPoolExecutor(max_workers=workers, initializer=setup_logging) as executor:
+        run_bounded(executor, partial(convert_batch, sink=sink, keep_combined=bool(indexes)), batches(), max_inflight(args, workers), handle)
+    return counts
+
+def listed(documents):
+    """Print each note as it goes through, instead of keeping the list for the summary."""
+    try:
+        for doc in documents:
+            print(f"- {doc.path}")
+            yield doc
+    finally:
+        close = getattr(documents, "close", None)
+        if close:
+            close()
+
+def convert_files(documents, manifest, sink, args, indexes=(), deleted=None, failed=None):
+    """Convert the notes coming out of documents (a generator is consumed as it produces).
+
+    Returns (counts, removed): status counts and outputs pruned for deleted notes. deleted,
+    when known (git), limits the deleted-note check to those paths. failed, when given, gets
+    the paths of the notes that couldn't be converted or written; nothing else grows with the vault.
+    """
+    try:
+        if args.executor == 'process':
+            counts = run_process_pool(documents, failed, manifest, sink, args, indexes)
+        else:
+            counts = run_threaded(documents, failed, manifest, sink, args, indexes)
+        sink.finalize()
+    except BaseException:
+        sink.abort()
+        raise
+    finally:
+        # Stops the scan's walker threads when conversion failed halfway
+        close = getattr(documents, "close", None)
+        if close:
+            close()
+    if deleted is None and manifest.entries and is_empty_folder(NOTES_FOLDER):
+        # An unmounted vault looks like every note was deleted: keep the outputs
+        logger.error(f"{NOTES_FOLDER} is empty, not removing the outputs of {len(manifest.entries)} notes", extra={
+            "status": "prune_skipped",
+            "destination_path": NOTES_FOLDER
+        })
+        print(f" ❌ {NOTES_FOLDER} is empty (vault not mounted?), kept the outputs of {len(manifest.entries)} notes")
+        removed = []
+    else:
+        removed = manifest.prune_deleted(dry_run=args.dry_run, remove_outputs=sink.per_note_outputs, candidates=deleted)
+    for md in removed:
+        log_file_result(md, "removed")
+        for index in indexes:
+            index.remove(md)
+    for index in indexes:
+        index.commit()
+    if not args.dry_run:
+        manifest.save()
+        manifest.save_outputs()
+    return counts, removed
+
+def watch(manifest, sink, path_filter, args, indexes=()):
+    def on_change(paths):
+        start = time.time()
+        try:
+            counts, removed = convert_files(iter_ai_paths(sorted(paths)), manifest, sink, args, indexes)
+        except Exception as e:
+            # A transient failure (FUSE hiccup, full disk) costs this batch, not the daemon
+            log_error(f"Watch batch of {len(paths)} changes failed", exception=e, destination_path=NOTES_FOLDER, files_scanned=len(paths))
+            print(f" ❌ {len(paths)} changed: batch failed ({type(e).__name__}: {e}), still watching")
+            flush_logs()
+            return
+        log_phase_timings(slowest=args.slowest)
+        log_processing_result(
+            status="watch_batch",
+            duration_sec=round(time.time() - start, 2),
+            files_scanned=len(paths),
+            files_indexed=counts["written"],
+            files_written=counts["written"],
+            files_unchanged=counts["unchanged"],
+            files_failed=counts["failed"]
+        )
+        print(f" 👀 {len(paths)} changed: wrote {counts['written']}, unchanged {counts['unchanged']}, failed {counts['failed']}, removed {len(removed)}")
+        flush_logs()
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt()
+    # systemd & co stop daemons with SIGTERM, exit the same clean way as Ctrl+C
+    signal.signal(signal.SIGTERM, stop)
+    # ctypes (inotify) is only loaded by the daemon
+    from services.watcher import watch_vault
+    print(f"\n 👀 Watching {NOTES_FOLDER} (Ctrl+C to stop)")
+    try:
+        watch_vault(
+            NOTES_FOLDER, on_change, mode=args.watch_mode, debounce=args.debounce,
+            poll_interval=args.poll_interval, path_filter=path_filter
+        )
+    except KeyboardInterrupt:
+        print(" 👋 Stopped watching")
+    finally:
+        if not args.dry_run:
+            frontmatter_cache.save()
+
+def log_concurrency(read_limit):
+    summary = read_limit.summary()
+    logger.info(f"Adaptive reads: {summary['changes']} changes, {summary['final']} in flight at the end", extra={
+        "status": "concurrency",
+        "concurrency": summary
+    })
+    return summary
+
+def print_concurrency(summary):
+    print(f"\n 🎛  Adaptive reads: {summary['final']} in flight at the end ({summary['lowest']}-{summary['highest']} used, bounds {summary['min']}-{summary['max']}), "
+          f"{summary['files_per_sec']} files/s, read p50 {summary['read_p50_ms']} ms")
+    for decision in summary["decisions"][-10:]:
+        print(f"    {decision['at_sec']:>7.2f} s  {decision['from']:>3} → {decision['to']:<3} {decision['files_per_sec']:>9.1f} files/s  "
+              f"{decision['read_p50_ms']:>8.2f} ms  {decision['reason']}")
+
+def print_phase_timings(timings):
+    print("\n ⏱  Phase timings (p50 / p95 / max ms)")
+    for phase, stats in timings["phases"].items():
+        print(f"    {phase:<12} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['max_ms']:>9.2f}  ({stats['count']} files, {stats['total_sec']} s)")
+    for item in timings["slowest_files"]:
+        print(f"    {item['total_ms']:>9.2f} ms  {item['file_name']}")
+
+# Subcommands read the outputs of past runs instead of converting: python -m obsidian-to-json search ...
+# Imported by name when called, runs don't load sqlite3 or gzip for them
+SUBCOMMANDS = {
+    "search": "services.search_cli",
+    "links": "services.link_cli",
+    "summarize": "services.log_cli",
+}
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        load_env()
+        return importlib.import_module(SUBCOMMANDS[sys.argv[1]]).main(sys.argv[2:])
+
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument('--dry-run', action='store_true', help='Simulate the process. No files will be written or overwritten.')
     parser.add_argument('--o', '--overwrite', dest='overwrite', action='store_true', help='Overwrite existing output JSON files.')
     parser.add_argument('--e', type=str, default='dev', choices=['prod', 'int', 'dev'], help='Set the environment (prod, int, dev).')
     parser.add_argument('--t', type=str, default='manual', choices=['manual', 'cron', 'auto'], help='Set the trigger (manual, cron, auto).')
     parser.add_argument('--pretty', action='store_true', help='Pretty-print JSON output (default is compact).')
+    parser.add_argument('--format', type=str, default='json', choices=['json', 'jsonl'], help='One JSON file per note, or a single JSON Lines bundle.')
+    parser.add_argument('--layout', type=str, default='flat', choices=OUTPUT_LAYOUTS, help='Where per-note JSON files go: flat, mirroring the vault tree, or sharded by a hash of the note path.')
+    parser.add_argument('--stream-threshold', type=float, default=8, metavar='MB', help='Notes above this size are parsed and written one section at a time (json format, no indexes).')
+    parser.add_argument('--shards', type=int, default=1, help='Split the JSON Lines bundle into N shards (jsonl format only).')
+    parser.add_argument('--validate', type=str, default='all', choices=VALIDATION_MODES, help='Schema-validate every note, a random sample, or none.')
+    parser.add_argument('--executor', type=str, default='thread', choices=['thread', 'process'], help='Run conversions on threads or worker processes.')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker threads/processes (default: Python decides).')
+    parser.add_argument('--chunk-size', type=int, default=16, help='Notes per batch sent to a worker process (process executor only).')
+    parser.add_argument('--queue-size', type=int, default=None, help='Notes (or batches) scanned but not yet converted before the scan waits (default: 4 per worker).')
+    parser.add_argument('--adaptive', action='store_true', help='Read notes on a pool whose size follows the measured read latency and throughput (network and FUSE mounts).')
+    parser.add_argument('--adaptive-min', type=int, default=2, help='Fewest notes read at once in adaptive mode.')
+    parser.add_argument('--adaptive-max', type=int, default=32, help='Most notes read at once in adaptive mode.')
+    parser.add_argument('--watch', action='store_true', help='After the initial run, keep converting notes as they change.')
+    parser.add_argument('--watch-mode', type=str, default='auto', choices=['auto', 'inotify', 'poll'], help='How changes are detected (auto picks polling on FUSE mounts).')
+    parser.add_argument('--debounce', type=float, default=0.5, help='Seconds of quiet before a burst of saves is converted.')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between scans in polling mode.')
+    parser.add_argument('--include', action='append', default=None, metavar='GLOB', help='Only scan files matching GLOB (repeatable, default: *.md).')
+    parser.add_argument('--exclude', action='append', default=None, metavar='GLOB', help='Skip files and prune folders matching GLOB (repeatable, hidden folders are always skipped).')
+    parser.add_argument('--since', type=str, default=None, metavar='REV', help='Vault under git: only convert notes added, modified or renamed since REV, and drop the outputs of deleted ones.')
+    parser.add_argument('--changed-only', action='store_true', help='Vault under git: same as --since with the commit of the last successful run (full scan the first time).')
+    parser.add_argument('--scan-workers', type=int, default=None, help='Threads walking the top-level folders of the vault (default: up to 8).')
+    parser.add_argument('--search-index', action='store_true', help='Keep a SQLite FTS5 index of the converted notes up to date (query it with the search subcommand).')
+    parser.add_argument('--link-index', action='store_true', help='Keep a tag and wikilink index with backlinks up to date (query it with the links subcommand).')
+    parser.add_argument('--export-url', type=str, default=None, metavar='URL', help='Send converted notes to an Elasticsearch-compatible _bulk endpoint (http[s]://[user:pass@]host:port).')
+    parser.add_argument('--export-index', type=str, default='obsidian-notes', help='Index the notes are exported to. Default: obsidian-notes')
+    parser.add_argument('--export-batch', type=int, default=500, help='Notes per bulk request.')
+    parser.add_argument('--export-batch-mb', type=float, default=5, metavar='MB', help='Bulk request size that sends a batch early.')
+    parser.add_argument('--export-flush', type=float, default=2.0, help='Seconds a partial batch waits before it is sent anyway.')
+    parser.add_argument('--export-retries', type=int, default=3, help='Retries for a bulk request on connection errors, 429 and 5xx.')
+    parser.add_argument('--slowest', type=int, default=10, help='How many of the slowest files the run summary lists.')
+    parser.add_argument('--profile', action='store_true', help='Write a cProfile dump and a top-functions summary next to the log.')
     parser.add_argument('--help', action='store_true', help='Show this help message and exit.')
     args = parser.parse_args()
 
@@ -32,55 +309,146 @@ def main():
         print_help()
         return
 
-    set_env_vars(args.e, args.t)
+    load_env()
+
+    if args.watch and args.format != 'json':
+        print(" ❌ --watch only supports --format json")
+        return
+
+    if args.layout != 'flat' and args.format != 'json':
+        print(" ❌ --layout only applies to --format json")
+        return
+
+    if (args.since or args.changed_only) and args.format != 'json':
+        print(" ❌ --since and --changed-only only support --format json")
+        return
+
+    if args.export_url and not args.export_url.startswith(('http://', 'https://')):
+        print(" ❌ --export-url must start with http:// or https://")
+        return
+
+    set_env_vars(args.e, args.t, args.validate)
+    setup_logging()
     logger.info("💥 Application starting", extra={"status": "startup", "env": args.e, "trigger": args.t})
 
+    if args.profile:
+        profiler.start()
+    indexes = []
     try:
-        metrics = process_files(NOTES_FOLDER)
-        ai_files = metrics["ai_files"]
+        path_filter = PathFilter(include=args.include, exclude=args.exclude)
+        from services.git_changes import GitState, repo_root, resolve, changed_notes
+        git_state = GitState.load(OUTPUT_FOLDER)
+        git_root = None
+        changes = None
+        # A recorded commit is kept up to date by every run, so --changed-only can pick up from a full run
+        if args.since or args.changed_only or git_state.exists():
+            git_root = repo_root(NOTES_FOLDER)
+        if args.since or args.changed_only:
+            if git_root is None:
+                log_error(f"{NOTES_FOLDER} is not in a git repository", destination_path=NOTES_FOLDER)
+                print(f" ❌ {NOTES_FOLDER} is not in a git repository")
+                return 1
+            since = args.since or git_state.head
+            commit = resolve(git_root, since) if since else None
+            if since and commit is None:
+                if args.since:
+                    log_error(f"Unknown git revision: {since}", destination_path=git_root)
+                    print(f" ❌ Unknown git revision: {since}")
+                    return 1
+                # Rebased, gc'd or re-cloned: the recorded commit is gone, start over from a full scan
+                log_error(f"Recorded commit {since} no longer exists, scanning the whole vault", destination_path=git_root)
+                print(f" ❌ Recorded commit {since[:10]} no longer exists, scanning the whole vault")
+            elif since:
+                changes = changed_notes(git_root, commit, NOTES_FOLDER, path_filter)
+                # Notes the last run saw with uncommitted edits: the diff can't tell if they were reverted
+                for md in git_state.pending:
+                    (changes.changed if os.path.exists(md) else changes.deleted).add(md)
+                logger.info(f"{len(changes)} notes changed since {commit}", extra={
+                    "status": "git_changes",
+                    "destination_path": git_root,
+                    "files_scanned": len(changes)
+                })
+                print(f" 🔀 {len(changes.changed)} notes changed, {len(changes.deleted)} deleted ({len(changes.renamed)} renamed) since {commit[:10]}")
+            else:
+                print(" 🔀 No commit recorded yet, scanning the whole vault")
+        ai_index = AiFlagIndex.load(OUTPUT_FOLDER)
+        manifest = Manifest.load(OUTPUT_FOLDER)
+        frontmatter_cache.attach(OUTPUT_FOLDER)
+        if args.format == 'jsonl':
+            sink = JsonlSink(OUTPUT_FOLDER, shards=args.shards, dry_run=args.dry_run)
+        else:
+            sink = JsonFileSink(
+                OUTPUT_FOLDER, dry_run=args.dry_run, pretty=args.pretty, layout=args.layout, root=NOTES_FOLDER,
+                stream_threshold=int(args.stream_threshold * 1024 * 1024)
+            )
+        if args.search_index and not args.dry_run:
+            from services.search_index import SearchIndex
+            indexes.append(SearchIndex(OUTPUT_FOLDER))
+        if args.link_index and not args.dry_run:
+            from services.link_index import LinkIndex
+            indexes.append(LinkIndex(OUTPUT_FOLDER))
+        if args.export_url and not args.dry_run:
+            from services.exporter import BulkExporter
+            indexes.append(BulkExporter(
+                args.export_url, OUTPUT_FOLDER, index=args.export_index, batch_docs=max(1, args.export_batch),
+                batch_bytes=int(args.export_batch_mb * 1024 * 1024), flush_interval=args.export_flush,
+                max_retries=max(0, args.export_retries)
+            ))
+        start_fm = time.time()
+        # Notes are converted while the scan is still walking the vault
+        metrics = {}
+        # Only git runs keep the failed paths, to look at them again next run
+        failed = [] if git_root else None
+        # Git runs open a handful of notes, only the vault scan has enough reads to measure
+        read_limit = AdaptiveLimit(args.adaptive_min, args.adaptive_max) if args.adaptive and changes is None else None
+        if changes is None:
+            documents = iter_ai_documents(NOTES_FOLDER, path_filter=path_filter, workers=args.scan_workers, ai_index=ai_index, stats=metrics, limit=read_limit)
+            counts, removed = convert_files(listed(documents), manifest, sink, args, indexes, failed=failed)
+        else:
+            # Only the notes git reported are opened; the AI-flag index only keeps notes a scan saw, leave it be
+            documents = iter_ai_paths(sorted(changes.changed), stats=metrics)
+            counts, removed = convert_files(listed(documents), manifest, sink, args, indexes, deleted=changes.deleted, failed=failed)
+        if not args.dry_run:
+            if changes is None:
+                ai_index.save()
+            frontmatter_cache.save()
+            if git_root:
+                # Notes that failed (conversion, write or export) are looked at again next run
+                for index in indexes:
+                    failed.extend(getattr(index, "failed_notes", ()))
+                git_state.record(git_root, NOTES_FOLDER, path_filter, retry=failed)
+                git_state.save()
         log_processing_result(
             status="scan_complete",
             duration_sec=metrics["duration_sec"],
             files_scanned=metrics["files_scanned"],
             files_indexed=metrics["files_indexed"],
+            files_cached=metrics["files_cached"],
             destination_path=NOTES_FOLDER
         )
-        start_fm = time.time()
-        saved = 0
-        skipped = 0
-        def process_file(md):
-            exists, json_path = file_exists_for(md, OUTPUT_FOLDER)
-            if exists and not args.overwrite:
-                log_file_result(md, "already_exists")
-                return False
-            fm = extract_frontmatter(md)
-            if not fm:
-                return False
-            structure = extract_markdown_structure(md)
-            if not structure:
-                return False
-            if save_combined_json(fm, structure, md, OUTPUT_FOLDER, dry_run=args.dry_run, pretty=args.pretty):
-                log_file_result(md, "converted")
-                return True
-            return False
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(process_file, md): md for md in ai_files}
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    saved += 1
-                else:
-                    skipped += 1
         log_processing_result(
             status="indexed_combined",
             duration_sec=round(time.time() - start_fm, 2),
-            files_indexed=saved
+            files_indexed=counts["written"],
+            files_written=counts["written"],
+            files_unchanged=counts["unchanged"],
+            files_failed=counts["failed"]
         )
-        print(f"\n ✅ Processed {saved} files with combined JSON in {OUTPUT_FOLDER}")
-        if skipped:
-            print(f" ⏩ Skipped {skipped} files (already exist, error, or missing data)")
-        for file in ai_files:
-            print(f"- {file}")
+        concurrency = log_concurrency(read_limit) if read_limit is not None else None
+        timings = log_phase_timings(slowest=args.slowest)
+        print(f"\n ✅ Wrote {counts['written']} files with combined JSON in {OUTPUT_FOLDER}")
+        if counts["unchanged"]:
+            print(f" ⏩ Left {counts['unchanged']} files untouched (content unchanged)")
+        if counts["failed"]:
+            print(f" ❌ Failed {counts['failed']} files (error or missing data, see the log)")
+        if removed:
+            print(f" 🗑  Removed {len(removed)} outputs for deleted notes")
+        if concurrency:
+            print_concurrency(concurrency)
+        if args.profile:
+            print_phase_timings(timings)
+        if args.watch:
+            watch(manifest, sink, path_filter, args, indexes)
     except FileNotFoundError as e:
         log_error(f"Folder not found: {NOTES_FOLDER}", exception=e, destination_path=NOTES_FOLDER)
     except PermissionError as e:
@@ -88,9 +456,14 @@ def main():
     except Exception as e:
         log_error("Unexpected error during file processing", exception=e, destination_path=OUTPUT_FOLDER)
     finally:
+        for index in indexes:
+            index.close()
+        if args.profile:
+            paths = profiler.stop()
+            if paths:
+                print(f"\n 🔬 Profile written to {paths[0]}, top functions in {paths[1]}")
         logger.info("💀 Application ending. All logs flushed. Goblin out.", extra={"status": "shutdown"})
-        for handler in logger.handlers:
-            handler.flush()
+        flush_logs()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Adaptive read concurrency: the vault scan with serial reads vs an AdaptiveLimit, at several read latencies.
+
+A FUSE or network mount is imitated by sleeping before each note is opened (the sleep releases
+the GIL, like a blocking read does), 0 ms being a local disk. For each latency the scan runs
+once with serial reads and once adaptive, and the report shows files/sec, where the limit
+settled and what it decided.
+
+    python -m benchmarks.bench_adaptive [--notes 3000] [--latencies 0,2,10] [--min 2] [--max 32]
+                                        [--ai-ratio 0.25] [--report report.json]
+
+Exits with 1 when the adaptive scan is more than --tolerance slower than serial reads at some latency.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+from benchmarks.vault_generator import generate_vault
+from services import ai_checker
+from services.document import NoteDocument
+from services.pipeline import AdaptiveLimit
+from utils.logger import logger
+
+def slow_loader(method, latency):
+    load = method.__func__
+
+    def loader(cls, path, *args):
+        time.sleep(latency)
+        return load(cls, path, *args)
+    return classmethod(loader)
+
+def scan(vault, limit):
+    start = time.perf_counter()
+    count = 0
+    for doc in ai_checker.iter_ai_documents(vault, limit=limit):
+        doc.close()
+        count += 1
+    return time.perf_counter() - start, count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=3000)
+    parser.add_argument("--latencies", type=str, default="0,2,10", help="Comma-separated milliseconds added to each read.")
+    parser.add_argument("--min", type=int, default=2, help="--adaptive-min")
+    parser.add_argument("--max", type=int, default=32, help="--adaptive-max")
+    parser.add_argument("--ai-ratio", type=float, default=0.25)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown of adaptive vs serial reads.")
+    parser.add_argument("--report", type=str, default=None, help="Write the JSON report to this file ('-' for stdout).")
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    workdir = tempfile.mkdtemp(prefix="bench-adaptive-")
+    vault = os.path.join(workdir, "vault")
+    generate_vault(vault, notes=args.notes, ai_ratio=args.ai_ratio)
+    originals = {name: NoteDocument.__dict__[name] for name in ("load", "load_if")}
+    results = []
+    try:
+        for latency_ms in (float(value) for value in args.latencies.split(",") if value.strip()):
+            for name, method in originals.items():
+                setattr(NoteDocument, name, slow_loader(method, latency_ms / 1000))
+            serial, found = scan(vault, None)
+            limit = AdaptiveLimit(args.min, args.max)
+            adaptive, _ = scan(vault, limit)
+            summary = limit.summary()
+            results.append({
+                "latency_ms": latency_ms,
+                "serial_files_per_sec": round(args.notes / serial, 1),
+                "adaptive_files_per_sec": round(args.notes / adaptive, 1),
+                "speedup": round(serial / adaptive, 2),
+                "ai_notes": found,
+                "concurrency": summary
+            })
+            print(f"{latency_ms:>6.1f} ms  serial {args.notes / serial:>9.1f} files/s  adaptive {args.notes / adaptive:>9.1f} files/s "
+                  f"(x{serial / adaptive:.2f}), limit {summary['final']} (used {summary['lowest']}-{summary['highest']}, {summary['changes']} changes)")
+    finally:
+        for name, method in originals.items():
+            setattr(NoteDocument, name, method)
+        shutil.rmtree(workdir)
+
+    if args.report:
+        text = json.dumps(results, indent=2)
+        if args.report == "-":
+            print(text)
+        else:
+            with open(args.report, "w", encoding="utf-8") as f:
+                f.write(text)
+    slower = [result for result in results if result["speedup"] < 1 - args.tolerance]
+    if slower:
+        print(f"\n❌ Adaptive reads slower than serial at {', '.join(str(result['latency_ms']) for result in slower)} ms")
+        return 1
+    print("\n✅ Adaptive reads never slower than serial beyond tolerance")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Bulk export benchmark against a local stub of the Elasticsearch _bulk endpoint.
+
+A stub server is started in-process, BulkExporter pushes synthetic notes to it, and the run checks
+that every note arrived exactly as the last version sent (no loss, no stale copy). The stub can
+answer slowly, fail whole requests with 503 and throttle single items with 429, so retries and
+backpressure are exercised too.
+
+    python -m benchmarks.bench_export [--docs 20000] [--batch 500] [--batch-mb 5] [--latency 0]
+                                      [--request-errors 0.0] [--item-throttle 0.0] [--seed 42]
+    python -m benchmarks.bench_export --serve 9200      # stub only, for manual --export-url runs
+
+Exits with 1 when a note is missing or out of date on the stub.
+"""
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.exporter import BulkExporter
+from utils.logger import logger
+
+class StubBulkServer(ThreadingHTTPServer):
+    """Keeps the latest document per _index/_id, like the real thing, and counts what it saw."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, request_errors=0.0, item_throttle=0.0, seed=42):
+        super().__init__(("127.0.0.1", port), BulkHandler)
+        self.latency = latency
+        self.request_errors = request_errors
+        self.item_throttle = item_throttle
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.documents = {}
+        self.requests = 0
+        self.rejected = 0
+        self.connections = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def apply(self, body):
+        lines = body.decode("utf-8").splitlines()
+        items = []
+        i = 0
+        with self.lock:
+            while i < len(lines):
+                action = json.loads(lines[i])
+                op, meta = next(iter(action.items()))
+                key = (meta["_index"], meta["_id"])
+                i += 1
+                if op in ("index", "create", "update"):
+                    source = json.loads(lines[i])
+                    i += 1
+                if self.item_throttle and self.random.random() < self.item_throttle:
+                    items.append({op: {"_id": meta["_id"], "status": 429, "error": {"type": "es_rejected_execution_exception"}}})
+                    continue
+                if op == "delete":
+                    status = 200 if self.documents.pop(key, None) is not None else 404
+                else:
+                    status = 200 if key in self.documents else 201
+                    self.documents[key] = source
+                items.append({op: {"_id": meta["_id"], "status": status}})
+        return {"took": 1, "errors": any(next(iter(item.values()))["status"] >= 300 for item in items), "items": items}
+
+class BulkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        if not self.path.endswith("/_bulk"):
+            return self._reply(404, {"error": f"no handler for {self.path}"})
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.requests += 1
+            fail = server.request_errors and server.random.random() < server.request_errors
+            if fail:
+                server.rejected += 1
+        if fail:
+            return self._reply(503, {"error": "stub unavailable"})
+        self._reply(200, server.apply(body))
+
+def synthetic_note(i, rng):
+    return {
+        "frontmatter": {"title": f"Note {i}", "ai": "yes", "tags": [f"tag{rng.randint(0, 50)}"]},
+        "structure": {"Summary": {"text": " ".join(f"word{rng.randint(0, 5000)}" for _ in range(rng.randint(20, 200)))}}
+    }
+
+def run(args):
+    rng = random.Random(args.seed)
+    server = StubBulkServer(
+        latency=args.latency / 1000, request_errors=args.request_errors, item_throttle=args.item_throttle, seed=args.seed
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    workdir = tempfile.mkdtemp(prefix="bench-export-")
+    exporter = BulkExporter(
+        server.url, workdir, batch_docs=args.batch, batch_bytes=int(args.batch_mb * 1024 * 1024),
+        flush_interval=0.5, max_retries=args.retries
+    )
+    expected = {}
+    start = time.perf_counter()
+    stalled = 0.0
+    try:
+        for i in range(args.docs):
+            md = f"/vault/note-{i}.md"
+            sha = f"{i:064x}"
+            combined = synthetic_note(i, rng)
+            t = time.perf_counter()
+            exporter.update(md, combined, sha)
+            stalled += time.perf_counter() - t
+            expected[BulkExporter.doc_id(md)] = sha
+        exporter.commit()
+        # A few notes are deleted again, the stub must forget them
+        for i in range(0, args.docs, 97):
+            md = f"/vault/note-{i}.md"
+            exporter.remove(md)
+            expected.pop(BulkExporter.doc_id(md))
+        exporter.commit()
+    finally:
+        exporter.close()
+        server.shutdown()
+    seconds = time.perf_counter() - start
+
+    stored = {doc_id: source["sha256"] for (_, doc_id), source in server.documents.items()}
+    acknowledged = {BulkExporter.doc_id(md): sha for md, sha in exporter.notes.items()}
+    missing = [doc_id for doc_id, sha in expected.items() if stored.get(doc_id) != sha]
+    # The export state must never claim a note the stub doesn't hold (or holds an older copy of)
+    disagree = [doc_id for doc_id, sha in acknowledged.items() if stored.get(doc_id) != sha]
+    extra = [doc_id for doc_id in stored if doc_id not in expected and doc_id not in acknowledged]
+    print(f"{args.docs} notes in {seconds:.2f} s ({args.docs / seconds:,.0f} notes/sec), "
+          f"{server.requests} requests ({server.rejected} rejected) over {server.connections} connections, "
+          f"{stalled:.2f} s blocked on backpressure")
+    print(f"stub holds {len(stored)} notes, {len(acknowledged)} acknowledged, {len(missing)} missing or stale, {len(extra)} unexpected")
+    # With failures injected, notes left after the last retry are only resent on the next run
+    if disagree or extra or (missing and not (args.request_errors or args.item_throttle)):
+        print("FAIL: the stub and the export state disagree")
+        return 1
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--batch-mb", type=float, default=5)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds the stub waits before answering.")
+    parser.add_argument("--request-errors", type=float, default=0.0, help="Share of requests answered with 503.")
+    parser.add_argument("--item-throttle", type=float, default=0.0, help="Share of items answered with 429.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--serve", type=int, default=None, metavar="PORT", help="Only run the stub on PORT until interrupted.")
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        server = StubBulkServer(
+            port=args.serve, latency=args.latency / 1000, request_errors=args.request_errors,
+            item_throttle=args.item_throttle, seed=args.seed
+        )
+        print(f"Stub _bulk endpoint on {server.url}, Ctrl-C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print(f"{server.requests} requests, {len(server.documents)} notes stored")
+        return 0
+
+    logger.setLevel(logging.WARNING)
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
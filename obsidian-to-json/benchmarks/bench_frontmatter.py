@@ -0,0 +1,83 @@
+"""Microbenchmark: pure-Python SafeLoader vs libyaml CSafeLoader vs the frontmatter cache.
+
+Frontmatter comes from the sample outputs in output/*.json, dumped back to YAML.
+
+    python -m benchmarks.bench_frontmatter [--repeat 300] [--rounds 5]
+"""
+import gc
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import yaml
+
+from services.frontmatter_cache import FrontmatterCache
+
+OUTPUT_SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output")
+
+def load_frontmatter_texts(folder=OUTPUT_SAMPLES):
+    texts = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        if path.endswith(".compact.json"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            frontmatter = json.load(f)["frontmatter"]
+        texts.append(yaml.safe_dump(frontmatter, sort_keys=False, allow_unicode=True))
+    return texts
+
+def _time(fn, corpus):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for item in corpus:
+            fn(item)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+def main():
+    parser = argparse.ArgumentParser(description="Frontmatter loader microbenchmark")
+    parser.add_argument("--repeat", type=int, default=300, help="How many times each sample header is parsed per round.")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per loader, best one is reported.")
+    args = parser.parse_args()
+
+    texts = load_frontmatter_texts()
+    if not texts:
+        print(f"No sample outputs found in {OUTPUT_SAMPLES}")
+        return 1
+    corpus = texts * args.repeat
+
+    cache = FrontmatterCache()
+    for text in texts:
+        key, _ = cache.get(text)
+        cache.put(key, yaml.safe_load(text))
+
+    loaders = {"SafeLoader (pure Python)": lambda text: yaml.load(text, Loader=yaml.SafeLoader)}
+    if getattr(yaml, "CSafeLoader", None):
+        loaders["CSafeLoader (libyaml)"] = lambda text: yaml.load(text, Loader=yaml.CSafeLoader)
+    else:
+        print("⚠️  PyYAML was built without libyaml, CSafeLoader skipped")
+    loaders["cache hit"] = lambda text: cache.get(text)[1]
+
+    for name, load in loaders.items():
+        if load(texts[0]) != yaml.safe_load(texts[0]):
+            print(f"❌ {name}: result differs from yaml.safe_load")
+            return 1
+
+    best = {name: float("inf") for name in loaders}
+    for _ in range(args.rounds):
+        for name, load in loaders.items():
+            best[name] = min(best[name], _time(load, corpus))
+
+    baseline = best["SafeLoader (pure Python)"]
+    print(f"{len(corpus)} headers per round, best of {args.rounds}")
+    for name, elapsed in best.items():
+        print(f"  {name:<26} {len(corpus) / elapsed:>12,.0f} headers/sec  {baseline / elapsed:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
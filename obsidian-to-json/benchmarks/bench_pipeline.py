@@ -0,0 +1,196 @@
+"""Pipeline benchmark: per-phase throughput on synthetic vaults, checked against a stored baseline.
+
+For every vault size a vault is generated (see benchmarks.vault_generator), then each phase is
+timed on its own: discovery (process_files), frontmatter, structure, validation and
+save_combined_json. Throughput is items/sec: files scanned for discovery, AI notes for the rest.
+
+    python -m benchmarks.bench_pipeline [--sizes 1000,10000,100000] [--rounds 3] [--report report.json]
+                                        [--baseline benchmarks/baseline_pipeline.json] [--tolerance 0.25]
+                                        [--update-baseline]
+
+Exits with 1 when a phase falls more than --tolerance below its baseline. Baselines are machine
+specific: refresh them with --update-baseline on the machine that runs the check.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.vault_generator import generate_vault
+from services.ai_checker import process_files
+from services.frontmatter_cache import frontmatter_cache
+from services.markdown_parser import extract_frontmatter
+from services.markdown_to_json import extract_markdown_structure, validate_json, save_combined_json
+from utils.logger import logger
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_pipeline.json")
+PHASES = ["discovery", "frontmatter", "structure", "validation", "save"]
+
+def _timed(fn):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = fn()
+        return time.perf_counter() - start, result
+    finally:
+        gc.enable()
+
+def run_size(notes, args, workdir):
+    vault = os.path.join(workdir, f"vault-{notes}")
+    ai_notes = generate_vault(
+        vault, notes=notes, note_lines=args.note_lines, code_density=args.code_density,
+        frontmatter_keys=args.frontmatter_keys, ai_ratio=args.ai_ratio, seed=args.seed
+    )
+    best = {phase: float("inf") for phase in PHASES}
+    items = {}
+    for round_index in range(args.rounds):
+        seconds, metrics = _timed(lambda: process_files(vault))
+        best["discovery"] = min(best["discovery"], seconds)
+        items["discovery"] = metrics["files_scanned"]
+        docs = list(metrics["documents"].values())
+        for phase in PHASES[1:]:
+            items[phase] = len(docs)
+
+        # Cold cache every round, otherwise later rounds only measure cache hits
+        frontmatter_cache.clear()
+        seconds, frontmatters = _timed(lambda: [extract_frontmatter(doc) for doc in docs])
+        best["frontmatter"] = min(best["frontmatter"], seconds)
+
+        seconds, structures = _timed(lambda: [extract_markdown_structure(doc) for doc in docs])
+        best["structure"] = min(best["structure"], seconds)
+
+        combined = [{"frontmatter": fm, "structure": st} for fm, st in zip(frontmatters, structures)]
+        seconds, _ = _timed(lambda: [validate_json(data) for data in combined])
+        best["validation"] = min(best["validation"], seconds)
+
+        # Validation was timed above, the save phase is the encode + write only
+        output_dir = os.path.join(workdir, f"out-{notes}-{round_index}")
+        os.environ["VALIDATE"] = "off"
+        seconds, _ = _timed(lambda: [
+            save_combined_json(fm, st, doc.path, output_dir)
+            for fm, st, doc in zip(frontmatters, structures, docs)
+        ])
+        os.environ.pop("VALIDATE")
+        best["save"] = min(best["save"], seconds)
+        shutil.rmtree(output_dir)
+
+        for doc in docs:
+            doc.close()
+    shutil.rmtree(vault)
+
+    return {
+        "notes": notes,
+        "ai_notes": ai_notes,
+        "phases": {
+            phase: {
+                "items": items[phase],
+                "seconds": round(best[phase], 4),
+                "per_sec": round(items[phase] / best[phase], 1) if best[phase] > 0 else None
+            }
+            for phase in PHASES
+        }
+    }
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for size, result in results.items():
+        expected = baseline.get("results", {}).get(size, {})
+        for phase, data in result["phases"].items():
+            floor = expected.get(phase)
+            if floor is None or data["per_sec"] is None:
+                continue
+            if data["per_sec"] < floor * (1 - tolerance):
+                regressions.append({"size": size, "phase": phase, "per_sec": data["per_sec"], "baseline": floor})
+    return regressions
+
+def load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-phase pipeline benchmark on synthetic vaults")
+    parser.add_argument("--sizes", type=str, default="1000,10000,100000", help="Comma-separated vault sizes, in notes.")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per size, best one is reported.")
+    parser.add_argument("--note-lines", type=int, default=60, help="Approximate body lines per note.")
+    parser.add_argument("--code-density", type=float, default=0.3, help="Chance that a block ends with a fenced code block.")
+    parser.add_argument("--frontmatter-keys", type=int, default=6, help="Extra frontmatter keys per note.")
+    parser.add_argument("--ai-ratio", type=float, default=0.25, help="Fraction of notes with ai: yes, they go through every phase.")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed of the vault generator.")
+    parser.add_argument("--report", type=str, default=None, help="Write the JSON report to this file ('-' for stdout).")
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH, help="Baseline throughput file.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed drop below the baseline before failing.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run's throughput as the new baseline.")
+    parser.add_argument("--workdir", type=str, default=None, help="Where vaults are generated (default: a temp folder).")
+    args = parser.parse_args()
+
+    # Only the pipeline is measured, not the per-note log lines
+    logger.setLevel(logging.WARNING)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    # Keep stdout pure JSON when the report goes there
+    out = sys.stderr if args.report == "-" else sys.stdout
+    workdir = tempfile.mkdtemp(prefix="obsidian-bench-", dir=args.workdir)
+    results = {}
+    try:
+        for notes in sizes:
+            result = results[str(notes)] = run_size(notes, args, workdir)
+            print(f"\n{notes} notes ({result['ai_notes']} with ai: yes)", file=out)
+            for phase, data in result["phases"].items():
+                print(f"  {phase:<12} {data['items']:>8} items  {data['seconds']:>9.3f} s  {data['per_sec'] or 0:>12,.0f} /sec", file=out)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = load_baseline(args.baseline)
+    regressions = [] if args.update_baseline else compare(results, baseline, args.tolerance)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": {
+            "rounds": args.rounds, "note_lines": args.note_lines, "code_density": args.code_density,
+            "frontmatter_keys": args.frontmatter_keys, "ai_ratio": args.ai_ratio, "seed": args.seed
+        },
+        "results": results,
+        "baseline": args.baseline,
+        "tolerance": args.tolerance,
+        "regressions": regressions
+    }
+    if args.report == "-":
+        print(json.dumps(report, indent=2))
+    elif args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        stored = baseline.get("results", {})
+        stored.update({
+            size: {phase: data["per_sec"] for phase, data in result["phases"].items()}
+            for size, result in results.items()
+        })
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"params": report["params"], "results": stored}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline updated in {args.baseline}", file=out)
+        return 0
+
+    if regressions:
+        print("\n❌ Throughput below baseline:", file=out)
+        for item in regressions:
+            print(f"  {item['size']} notes, {item['phase']}: {item['per_sec']:,.0f}/sec (baseline {item['baseline']:,.0f}/sec)", file=out)
+        return 1
+    print("\n✅ No phase below baseline" if baseline else "\n⚠️  No baseline found, nothing compared", file=out)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Startup benchmark: import time of the CLI, checked against a stored budget.
+
+Each scenario runs the CLI in a fresh interpreter with -X importtime and adds up the self time
+of every import. The scenarios are the ones cron pays for on every tick:
+
+    help    python -m obsidian-to-json --help
+    noop    a run over a small vault where every note is unchanged (the common cron case)
+
+    python -m benchmarks.bench_startup [--rounds 5] [--report report.json]
+                                       [--budget benchmarks/budget_startup.json] [--tolerance 0.5]
+                                       [--update-budget] [--imports-only]
+
+Exits with 1 when a scenario imports more than --tolerance above its budget, or imports one of
+the heavy modules (jsonschema, yaml, ...) or of the CLI's own optional ones (watcher, indexes,
+git, exporter, subcommands) it has no use for. --imports-only runs each scenario once and only
+checks the imports, no timing: a quick pass/fail check that doesn't depend on the machine. Import times depend on the machine,
+so each run also times a fixed set of stdlib imports (the reference) and the budget is scaled
+by how much faster or slower that reference is than when the budget was stored. Refresh the
+budget with --update-budget after a change that is meant to move it.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+from benchmarks.vault_generator import generate_vault
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budget_startup.json")
+SCENARIOS = {
+    "help": ["--help"],
+    "noop": ["--t", "cron"],
+}
+# Only runs that convert (or validate, or profile), watch, query or talk to git may load these
+FORBIDDEN = [
+    "jsonschema", "yaml", "pstats", "multiprocessing", "logging.handlers",
+    "ctypes", "sqlite3", "gzip", "subprocess", "http.client",
+    "services.watcher", "services.search_index", "services.link_index", "services.git_changes",
+    "services.exporter", "services.search_cli", "services.link_cli", "services.log_cli", "services.log_summary"
+]
+# Every run looks for a recorded git state (no git call, subprocess stays forbidden)
+ALLOWED = {"noop": {"services.git_changes"}}
+# Stdlib imports timed on every run to tell a slower machine from a slower CLI
+REFERENCE = "import argparse, json, logging, datetime, hashlib, concurrent.futures, uuid, random, queue"
+
+def parse_importtime(stderr):
+    """Total self time (µs) and the set of imported modules from -X importtime output."""
+    total, modules = 0, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        modules.add(name.strip())
+    return total, modules
+
+def run_scenario(argv, env, cwd):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + (argv if argv[0] == "-c" else [PACKAGE_DIR] + argv),
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited with {proc.returncode}: {proc.stderr[-500:]}")
+    import_us, modules = parse_importtime(proc.stderr)
+    return import_us, wall, modules
+
+def measure(rounds, workdir):
+    vault = os.path.join(workdir, "vault")
+    generate_vault(vault, notes=50, seed=0)
+    env = dict(os.environ, NOTES_FOLDER=vault, OUTPUT_FOLDER=os.path.join(workdir, "out"))
+    # First run converts everything, the measured ones then find nothing to do
+    run_scenario(SCENARIOS["noop"], env, workdir)
+    scenarios = dict(reference=["-c", REFERENCE], **SCENARIOS)
+    best = {name: (None, None, set()) for name in scenarios}
+    # Rounds go through every scenario in turn, so the reference sees the same machine load as the CLI
+    for _ in range(rounds):
+        for name, argv in scenarios.items():
+            import_us, wall, modules = run_scenario(argv, env, workdir)
+            best_import, best_wall, _ = best[name]
+            best[name] = (
+                import_us if best_import is None else min(best_import, import_us),
+                wall if best_wall is None else min(best_wall, wall),
+                modules
+            )
+    return {
+        name: {
+            "import_ms": round(best_import / 1000, 1),
+            "wall_ms": round(best_wall * 1000, 1),
+            "modules": len(modules),
+            "forbidden": sorted(module for module in FORBIDDEN if module in modules and module not in ALLOWED.get(name, ()))
+        }
+        for name, (best_import, best_wall, modules) in best.items()
+    }
+
+def machine_factor(results, budget):
+    """How much slower (> 1) or faster this machine imports the reference than the budget's."""
+    stored = budget.get("reference_ms")
+    if not stored:
+        return 1.0
+    return results["reference"]["import_ms"] / stored
+
+def compare(results, budget, tolerance):
+    violations = []
+    factor = machine_factor(results, budget)
+    for name, result in results.items():
+        if name == "reference":
+            continue
+        for module in result["forbidden"]:
+            violations.append(f"{name}: imports {module}")
+        limit = budget.get("results", {}).get(name)
+        if limit is not None and result["import_ms"] > limit * factor * (1 + tolerance):
+            violations.append(f"{name}: {result['import_ms']} ms of imports (budget {limit} ms x{factor:.2f} for this machine)")
+    return violations
+
+def load_budget(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI import-time benchmark against a stored budget")
+    parser.add_argument("--rounds", type=int, default=5, help="Runs per scenario, best one is reported.")
+    parser.add_argument("--report", type=str, default=None, help="Write the JSON report to this file ('-' for stdout).")
+    parser.add_argument("--budget", type=str, default=BUDGET_PATH, help="Import-time budget file.")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed excess over the scaled budget before failing (import times are noisy, the forbidden modules are the strict check).")
+    parser.add_argument("--update-budget", action="store_true", help="Store this run's import times as the new budget.")
+    parser.add_argument("--workdir", type=str, default=None, help="Where the vault is generated (default: a temp folder).")
+    parser.add_argument("--imports-only", action="store_true", help="One run per scenario, only check for forbidden imports.")
+    args = parser.parse_args()
+    if args.imports_only:
+        args.rounds, args.budget, args.update_budget = 1, None, False
+
+    out = sys.stderr if args.report == "-" else sys.stdout
+    workdir = tempfile.mkdtemp(prefix="obsidian-startup-", dir=args.workdir)
+    try:
+        results = measure(args.rounds, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    for name, data in results.items():
+        print(f"  {name:<9} imports {data['import_ms']:>7.1f} ms  wall {data['wall_ms']:>7.1f} ms  {data['modules']:>4} modules", file=out)
+
+    budget = load_budget(args.budget) if args.budget else {}
+    violations = [] if args.update_budget else compare(results, budget, args.tolerance)
+    if budget and not args.update_budget:
+        print(f"  machine factor x{machine_factor(results, budget):.2f} against the budget's reference", file=out)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+        "budget": args.budget,
+        "tolerance": args.tolerance,
+        "violations": violations
+    }
+    if args.report == "-":
+        print(json.dumps(report, indent=2))
+    elif args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_budget:
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump({
+                "reference_ms": results["reference"]["import_ms"],
+                "results": {name: data["import_ms"] for name, data in results.items() if name != "reference"}
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nBudget updated in {args.budget}", file=out)
+        return 0
+
+    if violations:
+        print("\n❌ Startup over budget:", file=out)
+        for item in violations:
+            print(f"  {item}", file=out)
+        return 1
+    if args.imports_only:
+        print("\n✅ No forbidden imports", file=out)
+    else:
+        print("\n✅ Startup within budget" if budget else "\n⚠️  No budget found, only forbidden imports checked", file=out)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
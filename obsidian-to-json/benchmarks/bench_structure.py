@@ -0,0 +1,159 @@
+"""Microbenchmark: legacy structure parser vs the single-pass tokenizer.
+
+The single-pass parser must give exactly what the legacy one gives on every note checked:
+the notes rebuilt from the sample outputs in output/*.json, a set of generated notes and,
+with --vault, every note of a real vault. Any difference fails the run. The timed corpus
+is the rebuilt samples.
+
+    python -m benchmarks.bench_structure [--repeat 200] [--rounds 7] [--generated 500] [--vault DIR]
+"""
+import gc
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import random
+import argparse
+
+import yaml
+
+from benchmarks.legacy_structure import extract_markdown_structure as legacy_structure
+from benchmarks import vault_generator
+from services.document import NoteDocument
+from services.markdown_to_json import extract_markdown_structure
+from utils.logger import logger
+
+OUTPUT_SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output")
+
+def _render_block(block, lines):
+    if block.get("description"):
+        lines += ["**description**", block["description"]]
+    if "commands" in block:
+        lines.append("**commands**")
+        lines += [f"- {c['name']}: {c['description']}" if c["description"] else f"- {c['name']}" for c in block["commands"]]
+    if "flags" in block:
+        lines.append("**flags**")
+        lines += [f"- {f['name']}: {f['value']}" for f in block["flags"]]
+    if "bullets" in block:
+        lines.append("**bullets**")
+        lines += [f"- `{b['label']}`: {b['description']}" if b["label"] else f"- {b['description']}" for b in block["bullets"]]
+    if "links" in block:
+        lines += [f"- [{l['text']}]({l['url']})" for l in block["links"]]
+    for code in block.get("code_blocks", []):
+        lines.append("```" + (code["language"] or ""))
+        lines += code["content"].split("\n")
+        lines.append("```")
+
+def render_note(data):
+    """Turn a converted note back into markdown the parser understands (not byte for byte the original)."""
+    lines = ["---", yaml.safe_dump(data["frontmatter"], sort_keys=False, allow_unicode=True).rstrip(), "---", ""]
+    for title, section in data["structure"].items():
+        lines.append(f"# {title}")
+        _render_block(section, lines)
+        for subtitle, subsection in section.get("sections", {}).items():
+            lines.append(f"## {subtitle}")
+            _render_block(subsection, lines)
+    return "\n".join(lines) + "\n"
+
+def load_samples(folder=OUTPUT_SAMPLES):
+    samples = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        if path.endswith(".compact.json"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        samples.append((os.path.basename(path), data, render_note(data)))
+    return samples
+
+def generated_notes(count, seed=0):
+    rng = random.Random(seed)
+    return [(f"generated-{i}.md", vault_generator.render_note(rng, i, True, code_density=0.5)) for i in range(count)]
+
+def vault_notes(folder):
+    notes = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in sorted(files):
+            if name.endswith(".md"):
+                path = os.path.join(root, name)
+                # Read the way the legacy parser read its files, universal newlines included
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    notes.append((path, f.read()))
+    return notes
+
+def first_difference(before, after):
+    for title in list(before) + [t for t in after if t not in before]:
+        if before.get(title) != after.get(title):
+            return f"section {title!r}: legacy {json.dumps(before.get(title))[:200]} / single-pass {json.dumps(after.get(title))[:200]}"
+    return "section order"
+
+def check(notes):
+    """Names of the notes the two parsers disagree on, each printed with its first difference."""
+    mismatches = []
+    for name, text in notes:
+        before = legacy_structure(text)
+        after = extract_markdown_structure(NoteDocument(name, text.encode("utf-8"), None))
+        if before != after:
+            mismatches.append(name)
+            print(f"❌ {name}: {first_difference(before, after)}")
+    return mismatches
+
+def _time(fn, corpus):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for item in corpus:
+            fn(item)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+def main():
+    parser = argparse.ArgumentParser(description="Structure parser microbenchmark")
+    parser.add_argument("--repeat", type=int, default=200, help="How many times each sample note is parsed per round.")
+    parser.add_argument("--rounds", type=int, default=7, help="Rounds per parser, best one is reported.")
+    parser.add_argument("--generated", type=int, default=500, help="Generated notes checked on top of the samples.")
+    parser.add_argument("--vault", help="Also check every note of this vault.")
+    args = parser.parse_args()
+
+    # Only the parsing is measured, not the start/finished log lines
+    logger.setLevel(logging.WARNING)
+
+    samples = load_samples()
+    if not samples:
+        print(f"No sample outputs found in {OUTPUT_SAMPLES}")
+        return 1
+
+    corpora = [("sample", [(name, text) for name, _, text in samples]), ("generated", generated_notes(args.generated))]
+    if args.vault:
+        corpora.append(("vault", vault_notes(args.vault)))
+    failed = False
+    for label, notes in corpora:
+        mismatches = check(notes)
+        failed = failed or bool(mismatches)
+        mark = "❌" if mismatches else "✅"
+        print(f"{mark} {label}: {len(notes) - len(mismatches)}/{len(notes)} notes identical to the legacy parser")
+    if failed:
+        return 1
+
+    texts = [text for _, _, text in samples] * args.repeat
+    docs = [NoteDocument(f"bench-{i}.md", text.encode("utf-8"), None) for i, text in enumerate(texts)]
+    total_lines = sum(text.count("\n") for text in texts)
+
+    # Rounds are interleaved so both parsers see the same machine noise, best one wins
+    legacy_sec = single_sec = float("inf")
+    for _ in range(args.rounds):
+        legacy_sec = min(legacy_sec, _time(legacy_structure, texts))
+        single_sec = min(single_sec, _time(extract_markdown_structure, docs))
+
+    print(f"\n{len(texts)} notes, {total_lines} lines per round, best of {args.rounds}")
+    print(f"  before (legacy)      {total_lines / legacy_sec:>12,.0f} lines/sec")
+    print(f"  after (single-pass)  {total_lines / single_sec:>12,.0f} lines/sec")
+    print(f"  speedup              {legacy_sec / single_sec:>12.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# Frozen copy of the structure parser as it was before the single-pass tokenizer,
+# minus logging. Only used as the "before" side of bench_structure.py.
+import re
+
+def extract_markdown_structure(content):
+    try:
+        # Remove frontmatter
+        content = re.sub(r'^---.*?---\s*\n', '', content, flags=re.DOTALL)
+
+        result = {}
+        current_section = None
+        current_subsection = None
+        capture_mode = None
+        buffer = []
+        in_code_block = False
+        code_language = None
+
+        lines = content.splitlines()
+
+        for line in lines:
+            stripped = line.strip()
+
+            # Handle code blocks
+            if stripped.startswith('```'):
+                if not in_code_block:
+                    if len(stripped) > 3:
+                        code_language = stripped[3:]
+                    in_code_block = True
+                    if buffer:
+                        _flush_buffer(result[current_section]["sections"][current_subsection] if current_subsection 
+                                   else result[current_section], capture_mode, buffer, current_section, current_subsection)
+                    buffer = []
+                    capture_mode = "code"
+                    continue
+                else:
+                    in_code_block = False
+                    if buffer:
+                        target = result[current_section]["sections"][current_subsection] if current_subsection else result[current_section]
+                        if "code_blocks" not in target:
+                            target["code_blocks"] = []
+                        target["code_blocks"].append({
+                            "language": code_language,
+                            "content": '\n'.join(buffer)
+                        })
+                    buffer = []
+                    code_language = None
+                    capture_mode = None
+                    continue
+
+            if in_code_block:
+                buffer.append(line)
+                continue
+
+            # Handle main sections and subsections
+            if stripped.startswith('# '):
+                if current_section and buffer:
+                    _flush_buffer(result[current_section], capture_mode, buffer, current_section, None)
+
+                current_section = stripped[2:].strip()
+                result[current_section] = {"description": "", "sections": {}}
+                current_subsection = None
+                capture_mode = None
+                buffer = []
+
+            elif stripped.startswith('## '):
+                if current_subsection and buffer:
+                    _flush_buffer(result[current_section]["sections"][current_subsection], capture_mode, buffer, current_section, current_subsection)
+                current_subsection = stripped[3:].strip()
+                result[current_section]["sections"][current_subsection] = {}
+                capture_mode = None
+                buffer = []
+
+            # Handle special flags
+            elif stripped.startswith('**') and stripped.endswith('**'):
+                if buffer:
+                    target = result[current_section]["sections"][current_subsection] if current_subsection else result[current_section]
+                    _flush_buffer(target, capture_mode, buffer, current_section, current_subsection)
+                
+                flag_type = stripped.strip('*').lower()
+                if flag_type in ['flags', 'commands', 'code', 'description', 'bullets', 'links']:
+                    capture_mode = flag_type
+                    buffer = []
+
+            elif stripped:
+                buffer.append(line)
+
+        # Flush any remaining buffer
+        if buffer:
+            target = result[current_section]["sections"][current_subsection] if current_subsection else result[current_section]
+            _flush_buffer(target, capture_mode, buffer, current_section, current_subsection)
+
+        return result
+
+    except Exception:
+        return None
+
+def _flush_buffer(target, mode, buffer, section_name=None, subsection_name=None):
+    text = '\n'.join(buffer).strip()
+    if not text:
+        return
+
+    if (section_name and section_name.lower() == "resources") or (subsection_name and subsection_name.lower() == "resources"):
+        target["links"] = _parse_links(text)
+        return
+
+    if mode == "description":
+        target["description"] = text
+    elif mode == "bullets":
+        target["bullets"] = _parse_bullets(text)
+    elif mode == "links":
+        target["links"] = _parse_links(text)
+    elif mode == "flags":
+        target["flags"] = _parse_flags(text)
+    elif mode == "commands":
+        target["commands"] = _parse_commands(text)
+    else:
+        if "description" in target and target["description"]:
+            target["description"] += "\n" + text
+        else:
+            target["description"] = text
+
+def _parse_flags(text):
+    flags = []
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('- '):
+            flag = stripped[2:].strip()
+            if ':' in flag:
+                key, value = flag.split(':', 1)
+                flags.append({"name": key.strip(), "value": value.strip()})
+            else:
+                flags.append({"name": flag, "value": True})
+    return flags
+
+def _parse_commands(text):
+    commands = []
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('- '):
+            command = stripped[2:].strip()
+            if ':' in command:
+                name, description = command.split(':', 1)
+                commands.append({"name": name.strip(), "description": description.strip()})
+            else:
+                commands.append({"name": command, "description": ""})
+    return commands
+
+def _parse_bullets(text):
+    bullets = []
+    pattern = r'-\s+`([^`]+)`:\s*(.*)'
+
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            continue
+            
+        match = re.match(pattern, stripped)
+        if match:
+            bullets.append({"label": match.group(1), "description": match.group(2)})
+        elif stripped.startswith('- '):
+            description = stripped[2:].strip()
+            bullets.append({"label": "", "description": description})
+    return bullets
+
+def _parse_links(text):
+    links = []
+    pattern = r'-\s+\[([^\]]+)\]\(([^)]+)\)'
+
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            continue
+            
+        match = re.match(pattern, stripped)
+        if match:
+            links.append({"text": match.group(1), "url": match.group(2)})
+    return links
@@ -0,0 +1,122 @@
+"""Synthetic Obsidian vault generator for the pipeline benchmark.
+
+Notes follow the layout the parsers expect: frontmatter with `ai:` on line 3, `# ` sections,
+`## ` subsections, `**mode**` blocks, fenced code and a Resources section. Everything comes
+from a seeded RNG, so the same arguments always give the same vault.
+
+    python -m benchmarks.vault_generator DEST [--notes 1000] [--note-lines 60] [--code-density 0.3]
+                                              [--frontmatter-keys 6] [--ai-ratio 0.05] [--seed 0]
+"""
+import os
+import sys
+import random
+import argparse
+
+WORDS = (
+    "cluster node deploy config token cache index vault query build release network storage "
+    "policy service agent metric backup schema worker queue shard replica secret volume ingress"
+).split()
+LANGUAGES = ["bash", "python", "yaml", "json", "", "sql"]
+CLASSES = ["references", "projects", "areas", "resources", "journal"]
+FOLDERS = ["00-inbox", "01-notes", "02-projects", "03-areas", "04-archives/03-references", "05-journal"]
+MODES = ["description", "commands", "flags", "bullets"]
+
+def _words(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+def _frontmatter(rng, index, ai, extra_keys):
+    lines = [
+        "---",
+        f"class: {rng.choice(CLASSES)}",
+        f"ai: {'yes' if ai else 'no'}",
+        f"title: note {index} {_words(rng, 2, 5)}",
+        f"created: '2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'",
+    ]
+    for key in range(extra_keys):
+        kind = key % 3
+        if kind == 0:
+            lines.append(f"tags_{key}:")
+            lines += [f"  - {rng.choice(WORDS)}/{rng.choice(WORDS)}" for _ in range(rng.randint(1, 4))]
+        elif kind == 1:
+            lines.append(f"project_{key}: '[[{rng.choice(WORDS)}-{rng.choice(WORDS)}]]'")
+        else:
+            lines.append(f"summary_{key}: {_words(rng, 4, 12)}")
+    lines.append("---")
+    return lines
+
+def _block(rng, code_density):
+    mode = rng.choice(MODES)
+    lines = [f"**{mode}**"]
+    count = rng.randint(2, 6)
+    if mode == "description":
+        lines += [_words(rng, 6, 16) for _ in range(count)]
+    elif mode == "commands":
+        lines += [f"- {rng.choice(WORDS)} {rng.choice(WORDS)}: {_words(rng, 3, 10)}" for _ in range(count)]
+    elif mode == "flags":
+        lines += [f"- --{rng.choice(WORDS)}: {rng.choice(WORDS)}" for _ in range(count)]
+    else:
+        lines += [f"- `{rng.choice(WORDS)}`: {_words(rng, 3, 10)}" for _ in range(count)]
+    if rng.random() < code_density:
+        lines.append("```" + rng.choice(LANGUAGES))
+        lines += [f"{rng.choice(WORDS)} --{rng.choice(WORDS)} {_words(rng, 1, 6)}" for _ in range(rng.randint(2, 12))]
+        lines.append("```")
+    return lines
+
+def render_note(rng, index, ai, note_lines=60, code_density=0.3, frontmatter_keys=6):
+    lines = _frontmatter(rng, index, ai, frontmatter_keys)
+    body_start = len(lines)
+    while len(lines) - body_start < note_lines:
+        lines.append(f"# {_words(rng, 1, 4).title()}")
+        lines += _block(rng, code_density)
+        for _ in range(rng.randint(0, 3)):
+            lines.append(f"## {_words(rng, 1, 3).title()}")
+            lines += _block(rng, code_density)
+    lines.append("# Resources")
+    lines += [f"- [{rng.choice(WORDS)}](https://example.com/{rng.choice(WORDS)}/{index})" for _ in range(rng.randint(1, 4))]
+    return "\n".join(lines) + "\n"
+
+def generate_vault(root, notes=1000, note_lines=60, code_density=0.3, frontmatter_keys=6, ai_ratio=0.05, seed=0):
+    """Write a vault of `notes` notes under root, returns how many of them carry `ai: yes`."""
+    rng = random.Random(f"{seed}:{notes}")
+    # Obsidian's own folders, which the scan is expected to skip
+    os.makedirs(os.path.join(root, ".obsidian"), exist_ok=True)
+    with open(os.path.join(root, ".obsidian", "workspace.json"), "w", encoding="utf-8") as f:
+        f.write("{}\n")
+    os.makedirs(os.path.join(root, ".trash"), exist_ok=True)
+
+    ai_notes = 0
+    created = set()
+    # Around 500 notes per folder, spread over the usual top-level folders
+    buckets = max(1, notes // 500)
+    for index in range(notes):
+        folder = os.path.join(root, FOLDERS[index % len(FOLDERS)], f"batch-{index % buckets:03d}")
+        if folder not in created:
+            os.makedirs(folder, exist_ok=True)
+            created.add(folder)
+        ai = rng.random() < ai_ratio
+        ai_notes += ai
+        text = render_note(rng, index, ai, note_lines=note_lines, code_density=code_density, frontmatter_keys=frontmatter_keys)
+        with open(os.path.join(folder, f"note-{index:06d}.md"), "w", encoding="utf-8") as f:
+            f.write(text)
+    return ai_notes
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Obsidian vault")
+    parser.add_argument("dest", help="Folder to create the vault in.")
+    parser.add_argument("--notes", type=int, default=1000, help="Number of notes.")
+    parser.add_argument("--note-lines", type=int, default=60, help="Approximate body lines per note.")
+    parser.add_argument("--code-density", type=float, default=0.3, help="Chance that a block ends with a fenced code block.")
+    parser.add_argument("--frontmatter-keys", type=int, default=6, help="Extra frontmatter keys per note.")
+    parser.add_argument("--ai-ratio", type=float, default=0.05, help="Fraction of notes with ai: yes on line 3.")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed.")
+    args = parser.parse_args()
+
+    ai_notes = generate_vault(
+        args.dest, notes=args.notes, note_lines=args.note_lines, code_density=args.code_density,
+        frontmatter_keys=args.frontmatter_keys, ai_ratio=args.ai_ratio, seed=args.seed
+    )
+    print(f"Generated {args.notes} notes ({ai_notes} with ai: yes) in {args.dest}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
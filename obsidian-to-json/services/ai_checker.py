@@ -1,35 +1,121 @@
 import os
 import time
+from services.document import NoteDocument, open_document
+from services.discovery import scan_vault
+from services.ai_index import signature
+from services.pipeline import iter_bounded
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger import phase_timings
 
-def discover_markdown_files(folder):
-    for root, _, files in os.walk(folder):
-        for file in files:
-            if file.endswith('.md'):
-                yield os.path.join(root, file)
+def is_ai_head(lines):
+    if len(lines) < 3:
+        return False
+    return 'ai: yes' in lines[2].strip().lower()
 
-def check_line_3_for_ai(file_path):
+def check_line_3_for_ai(source):
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for _ in range(2):  # Skip first two lines
-                next(f)
-            third_line = next(f).strip().lower()
-            return 'ai: yes' in third_line
-    except (StopIteration, FileNotFoundError, UnicodeDecodeError):
+        with open_document(source) as doc:
+            return is_ai_head(doc.head_lines(3))
+    except (FileNotFoundError, UnicodeDecodeError):
         return False
 
-def process_files(folder):
+def load_if_ai(file_path):
+    # Only the head of a non-AI note is read; AI notes are kept loaded so later stages don't reopen them
+    try:
+        return NoteDocument.load_if(file_path, 3, is_ai_head)
+    except (FileNotFoundError, UnicodeDecodeError):
+        return None
+
+def load_if_ai_indexed(entry, ai_index):
+    # Flag comes from the index while the stat signature holds, non-AI notes are never opened
+    key = os.path.abspath(entry.path)
+    try:
+        st = entry.stat()
+    except FileNotFoundError:
+        return None
+    flag = ai_index.lookup(key, st)
+    if flag is None:
+        doc = load_if_ai(entry.path)
+        ai_index.record(key, st, doc is not None)
+        return doc
+    if not flag:
+        return None
+    try:
+        doc = NoteDocument.load(entry.path)
+    except FileNotFoundError:
+        return None
+    # Edited between the stat and the read: check the content we actually got
+    if signature(doc.stat) != signature(st) and not check_line_3_for_ai(doc):
+        doc.close()
+        return None
+    return doc
+
+def iter_ai_documents(folder, path_filter=None, workers=None, ai_index=None, stats=None, limit=None):
+    """Yield a NoteDocument per AI note while the walkers are still reading folders.
+
+    stats (a dict) is kept up to date with the scan metrics, complete once the generator is exhausted.
+    With limit (an AdaptiveLimit), notes are read on a thread pool, as many at once as the limit
+    allows, and yielded as they are read; the limit follows the measured read latency and throughput.
+    """
+    stats = {} if stats is None else stats
     start_time = time.time()
+    stats.update(destination_path=os.path.abspath(folder), files_scanned=0, files_indexed=0, files_cached=0)
+
+    def read(entry):
+        start = time.perf_counter()
+        with phase_timings.phase("read", entry.path):
+            if ai_index is None:
+                doc = load_if_ai(entry.path)
+            else:
+                doc = load_if_ai_indexed(entry, ai_index)
+        if limit is not None:
+            limit.observe(time.perf_counter() - start, doc.stat.st_size if doc is not None else 0)
+        return doc
+
+    def scanned():
+        for entry in scan_vault(folder, path_filter=path_filter, workers=workers):
+            stats["files_scanned"] += 1
+            yield entry
 
+    entries = scanned()
+    executor = None
+    if limit is None:
+        docs = map(read, entries)
+    else:
+        # Sized for the upper bound, the limit decides how many of its threads have work
+        executor = ThreadPoolExecutor(max_workers=limit.maximum, thread_name_prefix="read")
+        docs = iter_bounded(executor, read, entries, limit)
     try:
-        all_files = list(discover_markdown_files(folder))
-        ai_files = [f for f in all_files if check_line_3_for_ai(f)]
-    
-        return {
-            "destination_path": os.path.abspath(folder),
-            "duration_sec": round(time.time() - start_time, 2),
-            "files_scanned": len(all_files),
-            "files_indexed": len(ai_files),
-            "ai_files": ai_files
-        }
-    except Exception as e:
-        raise
+        for doc in docs:
+            if doc is not None:
+                stats["files_indexed"] += 1
+                yield doc
+    finally:
+        if executor is not None:
+            docs.close()
+            executor.shutdown(wait=True, cancel_futures=True)
+        entries.close()
+    stats["files_cached"] = ai_index.hits if ai_index else 0
+    stats["duration_sec"] = round(time.time() - start_time, 2)
+
+def iter_ai_paths(paths, stats=None):
+    """Same as iter_ai_documents for a known list of paths (watch batches, git changes), missing ones skipped."""
+    stats = {} if stats is None else stats
+    start_time = time.time()
+    stats.update(files_scanned=0, files_indexed=0, files_cached=0)
+    for md in paths:
+        if not os.path.isfile(md):
+            continue
+        stats["files_scanned"] += 1
+        with phase_timings.phase("read", md):
+            doc = load_if_ai(md)
+        if doc is not None:
+            stats["files_indexed"] += 1
+            yield doc
+    stats["duration_sec"] = round(time.time() - start_time, 2)
+
+def process_files(folder, path_filter=None, workers=None, ai_index=None):
+    # Whole scan at once, the converter streams iter_ai_documents instead
+    stats = {}
+    documents = {doc.path: doc for doc in iter_ai_documents(folder, path_filter, workers, ai_index, stats)}
+    return dict(stats, ai_files=list(documents), documents=documents)
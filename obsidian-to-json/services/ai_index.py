@@ -0,0 +1,52 @@
+import os
+import threading
+from utils.logger import logger
+from utils.state import load_state, save_state_atomic
+
+INDEX_NAME = ".obsidian-to-json.ai-index.json"
+INDEX_VERSION = 1
+
+def signature(st):
+    return [st.st_ino, st.st_mtime_ns, st.st_size]
+
+class AiFlagIndex:
+    """Line-3 AI flag per note, valid as long as the note's (inode, mtime, size) stays the same."""
+
+    def __init__(self, output_dir, entries=None):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, INDEX_NAME)
+        self.entries = entries or {}
+        self.hits = 0
+        self.misses = 0
+        # Only notes seen by this scan are written back, deleted ones drop out
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, output_dir):
+        data = load_state(os.path.join(output_dir, INDEX_NAME), INDEX_VERSION, "AI-flag index", "ai_index_reset")
+        return cls(output_dir, data.get("files", {}) if data else None)
+
+    def lookup(self, path, st):
+        """Cached flag (True/False) for path, or None when the note changed since it was checked."""
+        entry = self.entries.get(path)
+        with self._lock:
+            if entry is None or entry[:3] != signature(st):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._seen[path] = entry
+        return entry[3]
+
+    def record(self, path, st, flag):
+        with self._lock:
+            self._seen[path] = signature(st) + [flag]
+
+    def save(self):
+        with self._lock:
+            save_state_atomic(self.path, {"version": INDEX_VERSION, "files": self._seen})
+        logger.info(f"AI-flag index: {self.hits} hits, {self.misses} misses", extra={
+            "status": "ai_index",
+            "destination_path": self.path
+        })
+        return self.path
@@ -0,0 +1,60 @@
+from services.document import NoteDocument
+from services.discovery import scan_vault, PathFilter
+from services.ai_checker import check_line_3_for_ai, load_if_ai
+from services.converter import build_document
+from utils.logger import phase_timings
+
+def is_ai_note(doc):
+    """Default predicate of iter_vault, the CLI's rule: `ai: yes` on line 3."""
+    return check_line_3_for_ai(doc)
+
+def _convert(doc, validate):
+    try:
+        combined = build_document(doc, validate=validate)
+    finally:
+        # No run summary in-process, so a long-lived host doesn't pile up per-note timings
+        phase_timings.pop(doc.path)
+    if combined is None:
+        return None
+    return {"path": doc.path, "frontmatter": combined["frontmatter"], "structure": combined["structure"]}
+
+def convert_file(path, validate=True):
+    """Convert one note in memory: {"path", "frontmatter", "structure"}, or None when it can't be converted.
+
+    Same result as the JSON the CLI writes for the note, before serialization (dates stay dates).
+    Nothing is written to disk. Conversion problems are logged on the "obsidian-to-json" logger,
+    an unreadable path raises OSError.
+    """
+    with NoteDocument.load(path) as doc:
+        return _convert(doc, validate)
+
+def _load(path, predicate):
+    # The CLI's rule is settled on the note's head, a custom predicate needs the whole note
+    if predicate is is_ai_note:
+        return load_if_ai(path)
+    try:
+        doc = NoteDocument.load(path)
+    except FileNotFoundError:
+        # Deleted between the scan and the read
+        return None
+    if predicate is not None and not predicate(doc):
+        doc.close()
+        return None
+    return doc
+
+def iter_vault(folder, predicate=is_ai_note, include=None, exclude=None, scan_workers=None, validate=True):
+    """Yield convert_file's result for every note of folder that predicate accepts, as the scan finds them.
+
+    predicate gets the loaded NoteDocument (path, frontmatter_text, head_lines()...); None takes
+    every note. With the default one only the head of the other notes is read. include/exclude are the CLI's --include/--exclude globs. Notes that can't be
+    converted are skipped (and logged). Stopping the iteration early stops the scan too.
+    """
+    path_filter = PathFilter(include=include, exclude=exclude)
+    for entry in scan_vault(folder, path_filter=path_filter, workers=scan_workers):
+        doc = _load(entry.path, predicate)
+        if doc is None:
+            continue
+        with doc:
+            note = _convert(doc, validate)
+        if note is not None:
+            yield note
@@ -4,16 +4,53 @@ Obsidian-to-JSON CLI
 
 Usage:
   python -m obsidian-to-json [OPTIONS]
+  python -m obsidian-to-json search [QUERY] [--kind KIND] [--section TITLE] [--files] [--json] [--limit N]
+  python -m obsidian-to-json links [--tag TAG | --backlinks NOTE | --note PATH | --tags] [--json]
+  python -m obsidian-to-json summarize [--runs N | --since 24h | --execution-id ID] [--json] [--log PATH]
 
 Options:
   --dry-run           Simulate the process. No files will be written or overwritten.
   --o, --overwrite    Overwrite existing output JSON files.
   --e ENV             Set the environment (prod, int, dev). Default: dev
   --t TRIGGER         Set the trigger (manual, cron, auto). Default: manual
+  --pretty            Pretty-print JSON output (default is compact).
+  --format FORMAT     One JSON file per note, or one JSON Lines bundle (json, jsonl). Default: json
+  --layout LAYOUT     Where per-note JSON files go (flat, mirror, hashed). Default: flat
+  --stream-threshold MB  Notes above this size are parsed and written one section at a time. Default: 8
+  --shards N          Split the JSON Lines bundle into N shards. Default: 1
+  --validate MODE     Schema-validate every note, a ~10% sample, or none (all, sample, off). Default: all
+  --executor MODE     Run conversions on threads or worker processes (thread, process). Default: thread
+  --workers N         Number of worker threads/processes. Default: Python decides
+  --chunk-size K      Notes per batch sent to a worker process. Default: 16
+  --queue-size N      Notes (or batches) scanned ahead of the workers before the scan waits. Default: 4 per worker
+  --adaptive          Read notes on a pool that grows or shrinks with the measured read latency and throughput
+                      (network and FUSE mounts). Decisions are printed and logged with the run summary.
+  --adaptive-min N    Fewest notes read at once in adaptive mode. Default: 2
+  --adaptive-max N    Most notes read at once in adaptive mode. Default: 32
+  --watch             After the initial run, keep running and convert notes as they are saved.
+  --watch-mode MODE   How changes are detected (auto, inotify, poll). auto polls on FUSE mounts. Default: auto
+  --debounce SEC      Quiet time before a burst of saves is converted. Default: 0.5
+  --poll-interval SEC Seconds between scans in polling mode. Default: 2.0
+  --include GLOB      Only scan files matching GLOB, repeatable. Default: *.md
+  --exclude GLOB      Skip files and prune folders matching GLOB, repeatable. Hidden folders are always skipped.
+  --since REV         Vault under git: only convert notes added, modified or renamed since REV (and uncommitted
+                      edits), drop the outputs of notes deleted or renamed away. No vault walk.
+  --changed-only      Same as --since with the commit recorded by the last successful run (full scan the first time).
+  --scan-workers N    Threads walking the vault's top-level folders. Default: up to 8
+  --search-index      Keep OUTPUT_FOLDER/obsidian-to-json.sqlite (SQLite FTS5) in sync with the converted notes.
+  --link-index        Keep OUTPUT_FOLDER/obsidian-to-json.links.sqlite (tags, wikilinks, backlinks) in sync.
+  --export-url URL    Send converted notes to an Elasticsearch-compatible _bulk endpoint (http[s]://[user:pass@]host:port).
+  --export-index NAME Index the notes go to. Default: obsidian-notes
+  --export-batch N    Notes per bulk request. Default: 500
+  --export-batch-mb MB  Request size that sends a batch early. Default: 5
+  --export-flush SEC  Seconds a partial batch waits before it is sent anyway. Default: 2.0
+  --export-retries N  Retries on connection errors, 429 and 5xx, with exponential backoff. Default: 3
+  --slowest N         How many of the slowest files the run summary lists. Default: 10
+  --profile           Write a cProfile dump (output/obsidian-to-json.prof) and a top-functions summary next to the log.
   --help              Show this help message and exit.
 
 Examples:
-  # Basic usage (process all new files, skip existing outputs)
+  # Basic usage (process new and changed files, skip unchanged ones)
   python -m obsidian-to-json
 
   # Overwrite all output files
@@ -22,12 +59,55 @@ Examples:
   # Dry run (simulate, no changes)
   python -m obsidian-to-json --dry-run
 
+  # Big vault, parse on 8 worker processes in batches of 32 notes
+  python -m obsidian-to-json --executor process --workers 8 --chunk-size 32
+
+  # Big vault with duplicate note names: one folder per hash prefix, no name collisions
+  python -m obsidian-to-json --layout hashed
+
+  # Whole vault as a single JSON Lines bundle (one record per note, with its source path)
+  python -m obsidian-to-json --format jsonl
+
+  # Vault is a git repository: cron runs only look at what changed since the last run
+  python -m obsidian-to-json --changed-only --t cron
+
+  # Vault on a Google Drive FUSE mount: overlap slow reads, let the run find how many
+  python -m obsidian-to-json --adaptive --adaptive-max 64
+
+  # Leave attachments and templates out of the scan
+  python -m obsidian-to-json --exclude attachments --exclude 'templates/*'
+
+  # Daemon: convert edits within a second or two instead of waiting for cron
+  python -m obsidian-to-json --watch --t auto
+
+  # How did last night's cron runs go? Counts per status, errors, files written
+  python -m obsidian-to-json summarize --since 24h
+
+  # Where does the time go? Per-phase p50/p95/max, slowest notes and a cProfile dump
+  python -m obsidian-to-json --o --profile
+
+  # Index while converting, then look things up without loading every JSON
+  python -m obsidian-to-json --search-index
+  python -m obsidian-to-json search "gcloud init"
+  python -m obsidian-to-json search --kind link --section Resources
+
+  # Tag and backlink lookups for dashboards
+  python -m obsidian-to-json --link-index
+  python -m obsidian-to-json links --tag platform/gcp
+  python -m obsidian-to-json links --backlinks deploy-software-kubernets
+
+  # Keep an Elasticsearch/OpenSearch index in sync, only changed and deleted notes are sent
+  python -m obsidian-to-json --export-url http://localhost:9200 --export-index notes
+
   # Set environment and trigger
   python -m obsidian-to-json --e prod --t cron
 
 Description:
   This tool scans your Obsidian markdown folder, extracts frontmatter and structure, and saves them as JSON files.
-  By default, it skips files that already have a corresponding JSON output. Use --o to force overwrite.
+  By default, it skips notes that have not changed since the last run. A manifest in the output folder
+  (.obsidian-to-json.manifest.json) tracks size, mtime and content hash per note; outputs of deleted
+  notes are removed. Use --o to force overwrite. The ai: yes check is cached per note
+  (.obsidian-to-json.ai-index.json), so only new or modified notes are opened during the scan.
   Use --dry-run to see what would happen without making any changes.
   The --e and --t flags are used for logging and observability.
 """
@@ -0,0 +1,96 @@
+from services.document import NoteDocument
+from services.markdown_parser import extract_frontmatter
+from services.markdown_to_json import extract_markdown_structure, build_combined
+from services.manifest import make_entry
+from services.frontmatter_cache import frontmatter_cache
+from utils.logger import log_file_result, log_error, flush_logs, phase_timings
+from utils.profiler import worker_profile
+
+def build_document(doc, validate=None):
+    with phase_timings.phase("frontmatter", doc.path):
+        fm = extract_frontmatter(doc)
+    if not fm:
+        return None
+    with phase_timings.phase("structure", doc.path):
+        structure = extract_markdown_structure(doc)
+    if not structure:
+        return None
+    return build_combined(fm, structure, doc.path, validate=validate)
+
+def stream_document(doc, sink):
+    """Big notes: structure parsed and written one section at a time, see JsonFileSink.stream."""
+    with phase_timings.phase("frontmatter", doc.path):
+        fm = extract_frontmatter(doc)
+    if not fm:
+        return None, "failed"
+    with phase_timings.phase("stream", doc.path):
+        return sink.stream(doc, fm)
+
+def convert_document(doc, sink, stream=True):
+    """Returns (output path, "written" | "unchanged", combined), or (None, "failed", None).
+
+    A streamed note comes back without combined; stream=False keeps every note in memory,
+    for callers that need it (the indexes).
+    """
+    if stream and sink.streams(doc):
+        json_path, status = stream_document(doc, sink)
+        if status != "fallback":
+            return json_path, status, None
+    combined = build_document(doc)
+    if combined is None:
+        return None, "failed", None
+    with phase_timings.phase("write", doc.path):
+        json_path, status = sink.emit(doc.path, combined)
+    return json_path, status, combined
+
+def convert_batch(notes, sink, keep_combined=False):
+    # Runs inside a worker process: only small status records travel back to the parent.
+    # notes holds NoteDocuments the parent already read, or paths the worker loads itself.
+    # payload is the encoded record for sinks the parent has to write itself, None otherwise.
+    # combined is only sent back when the parent maintains indexes over the notes.
+    # Timings of each note travel back with its record, the parent writes the run summary.
+    # Returns (results, frontmatter cache updates), the parent merges the updates into its cache.
+    results = []
+    # Starts collecting this batch's cache entries, and drops the counts a forked worker inherited
+    frontmatter_cache.take_updates()
+    with worker_profile():
+        for item in notes:
+            payload = None
+            entry = None
+            combined = None
+            md = item if isinstance(item, str) else item.path
+            try:
+                if isinstance(item, str):
+                    with phase_timings.phase("read", md):
+                        doc = NoteDocument.load(md)
+                else:
+                    doc = item
+                with doc:
+                    json_path, status = None, "fallback"
+                    if not keep_combined and sink.streams(doc):
+                        json_path, status = stream_document(doc, sink)
+                    if status == "fallback":
+                        combined = build_document(doc)
+                        with phase_timings.phase("write", md):
+                            if combined is None:
+                                json_path, status = None, "failed"
+                            elif sink.collect_in_parent:
+                                payload = sink.encode(md, combined)
+                                json_path, status = sink.target_for(md), "written"
+                            else:
+                                json_path, status = sink.emit(md, combined)
+                    if json_path and not sink.dry_run:
+                        entry = make_entry(md, json_path, doc)
+            except OSError as e:
+                log_error(f"Could not read {md}", exception=e, file_name=md)
+                json_path, status = None, "failed"
+            if json_path:
+                log_file_result(md, "converted")
+            results.append({
+                "path": md, "json_path": json_path, "status": status, "entry": entry,
+                "payload": payload, "timings": phase_timings.pop(md),
+                "combined": combined if keep_combined and json_path else None
+            })
+    # Worker processes skip atexit, so don't leave the batch's log lines in the buffer
+    flush_logs()
+    return results, frontmatter_cache.take_updates()
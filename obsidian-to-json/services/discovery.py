@@ -0,0 +1,146 @@
+import os
+import re
+import queue
+import fnmatch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger import logger
+
+DEFAULT_INCLUDE = ("*.md",)
+# Hidden folders: .obsidian, .trash, .git, ... never hold notes worth converting
+DEFAULT_EXCLUDE = (".*",)
+
+_DONE = object()
+
+def _compile(patterns):
+    """One regex per side: patterns without a '/' match the name at any depth, the others the vault-relative path."""
+    by_name = [fnmatch.translate(p) for p in patterns if "/" not in p]
+    by_path = [fnmatch.translate(p.strip("/")) for p in patterns if "/" in p]
+    name_re = re.compile("|".join(by_name)).match if by_name else None
+    path_re = re.compile("|".join(by_path)).match if by_path else None
+    return name_re, path_re
+
+class PathFilter:
+    """Include/exclude globs, matched gitignore-style against a name or a vault-relative path."""
+
+    def __init__(self, include=None, exclude=None):
+        self.include = tuple(include or DEFAULT_INCLUDE)
+        self.exclude = tuple(DEFAULT_EXCLUDE) + tuple(exclude or ())
+        self._include = _compile(self.include)
+        self._exclude = _compile(self.exclude)
+
+    @staticmethod
+    def _matches(compiled, name, rel):
+        name_re, path_re = compiled
+        return bool((name_re and name_re(name)) or (path_re and path_re(rel)))
+
+    def prune(self, name, rel):
+        """True when a folder, by name or vault-relative path, should not be descended into."""
+        return self._matches(self._exclude, name, rel)
+
+    def accept(self, name, rel):
+        return self._matches(self._include, name, rel) and not self._matches(self._exclude, name, rel)
+
+    def prune_path(self, path, root):
+        """True when the folder path, or one of its parents below root, is excluded."""
+        rel = os.path.relpath(path, root).replace(os.sep, "/")
+        if rel == ".":
+            return False
+        parts = rel.split("/")
+        return any(self.prune(part, "/".join(parts[:i + 1])) for i, part in enumerate(parts))
+
+    def accept_path(self, path, root):
+        """Same answer scan_vault would give for the file path under root."""
+        parent = os.path.dirname(path)
+        if self.prune_path(parent, root):
+            return False
+        rel = os.path.relpath(path, root).replace(os.sep, "/")
+        return self.accept(os.path.basename(path), rel)
+
+def _scan_dir(path, rel, path_filter, files, dirs):
+    with os.scandir(path) as it:
+        for entry in it:
+            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                # d_type from readdir, no stat call on most filesystems
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                # Symlinked folders are listed but not followed, same as os.walk
+                if not entry.is_symlink() and not path_filter.prune(entry.name, entry_rel):
+                    dirs.append((entry.path, entry_rel))
+            elif path_filter.accept(entry.name, entry_rel):
+                files.append(entry)
+
+def _put(out, item, stop):
+    # Blocks while the consumer is behind, gives up once it has stopped reading
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+def _walk_subtree(path, rel, path_filter, out, stop):
+    stack = [(path, rel)]
+    try:
+        while stack and not stop.is_set():
+            current, current_rel = stack.pop()
+            files = []
+            try:
+                _scan_dir(current, current_rel, path_filter, files, stack)
+            except OSError as e:
+                logger.warning(f"Skipping unreadable folder {current}", extra={
+                    "status": "scan_skipped",
+                    "error_type": type(e).__name__,
+                    "error_details": str(e)
+                })
+                continue
+            if files:
+                _put(out, files, stop)
+    finally:
+        _put(out, _DONE, stop)
+
+def scan_vault(folder, path_filter=None, workers=None):
+    """Yield an os.DirEntry per note in folder, as soon as its folder has been read.
+
+    Top-level folders are walked in parallel, excluded folders are never entered.
+    The entries keep their cached stat results for the later stages. Walkers hold
+    back once a few folders' worth of entries are waiting, so a slow consumer keeps
+    the scan from racing ahead.
+    """
+    path_filter = path_filter or PathFilter()
+    files, subtrees = [], []
+    # Missing or unreadable vault raises here, instead of looking like an empty vault
+    _scan_dir(folder, "", path_filter, files, subtrees)
+    yield from files
+    if not subtrees:
+        return
+
+    stop = threading.Event()
+    workers = workers or min(8, len(subtrees))
+    out = queue.Queue(maxsize=2 * workers)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+    try:
+        for path, rel in subtrees:
+            executor.submit(_walk_subtree, path, rel, path_filter, out, stop)
+        remaining = len(subtrees)
+        while remaining:
+            batch = out.get()
+            if batch is _DONE:
+                remaining -= 1
+                continue
+            yield from batch
+    finally:
+        # Consumer stopped early (or failed): let the walkers wind down
+        stop.set()
+        executor.shutdown(wait=True)
+
+def is_empty_folder(folder):
+    """True when folder has no entries at all (or is gone), like the mount point of an unmounted vault."""
+    try:
+        with os.scandir(folder) as entries:
+            return next(entries, None) is None
+    except OSError:
+        return True
@@ -0,0 +1,150 @@
+import os
+import re
+import mmap
+import hashlib
+from contextlib import contextmanager
+
+# Files above this size are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 1024 * 1024
+# Read size while looking at the first lines of a note that may not be loaded
+HEAD_CHUNK = 4096
+
+# Same delimiters the parsers always used, applied once on the raw bytes
+FRONTMATTER_RE = re.compile(rb'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+FRONTMATTER_STRIP_RE = re.compile(rb'^---.*?---\s*\n', re.DOTALL)
+
+def _decode(data):
+    text = data.decode('utf-8')
+    # Mirror text-mode universal newlines so parsers see the same content as before
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def _head_lines(raw, count):
+    lines = []
+    pos = 0
+    while len(lines) < count:
+        end = raw.find(b'\n', pos)
+        if end == -1:
+            if pos < len(raw):
+                lines.append(_decode(raw[pos:]))
+            break
+        lines.append(_decode(raw[pos:end + 1]))
+        pos = end + 1
+    return lines
+
+class NoteDocument:
+    """A note loaded once (memory-mapped when large) and shared by every pipeline stage."""
+
+    def __init__(self, path, raw, stat, mapped=False):
+        self.path = path
+        self.raw = raw
+        self.stat = stat
+        self.mapped = mapped
+        self.frontmatter_span = None
+        self.body_span = (0, len(raw))
+
+        match = FRONTMATTER_RE.search(raw)
+        if match:
+            start, end = match.span(1)
+            if end > start and raw[end - 1:end] == b'\r':
+                end -= 1
+            self.frontmatter_span = (start, end)
+        strip = FRONTMATTER_STRIP_RE.match(raw)
+        if strip:
+            self.body_span = (strip.end(), len(raw))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if st.st_size >= MMAP_THRESHOLD:
+                try:
+                    return cls(path, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), st, mapped=True)
+                except (OSError, ValueError):
+                    # Some FUSE mounts refuse mmap, plain read still works
+                    pass
+            return cls(path, f.read(), st)
+
+    @classmethod
+    def load_if(cls, path, count, accept):
+        """Load path only when accept(first count lines) is true, None otherwise.
+
+        Just enough of the file for those lines is read first, so a rejected note costs a
+        chunk or two instead of a whole read; an accepted one keeps that chunk.
+        """
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            chunks = []
+            newlines = 0
+            while newlines < count:
+                chunk = f.read(HEAD_CHUNK)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                newlines += chunk.count(b'\n')
+            head = b''.join(chunks)
+            if not accept(_head_lines(head, count)):
+                return None
+            if st.st_size >= MMAP_THRESHOLD:
+                try:
+                    return cls(path, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), st, mapped=True)
+                except (OSError, ValueError):
+                    pass
+            return cls(path, head + f.read(), st)
+
+    def head_lines(self, count):
+        return _head_lines(self.raw, count)
+
+    @property
+    def frontmatter_text(self):
+        if self.frontmatter_span is None:
+            return None
+        start, end = self.frontmatter_span
+        return _decode(self.raw[start:end])
+
+    @property
+    def body_text(self):
+        start, end = self.body_span
+        return _decode(self.raw[start:end])
+
+    def iter_body_lines(self):
+        """The body's lines one at a time, split exactly like body_text.splitlines().
+
+        Only the current line is decoded, so a memory-mapped note is never copied whole.
+        """
+        raw = self.raw
+        pos, end = self.body_span
+        while pos < end:
+            newline = raw.find(b'\n', pos, end)
+            if newline == -1:
+                yield from raw[pos:end].decode('utf-8').splitlines()
+                return
+            # Keeping the '\n' keeps empty lines; '\r' and the other breaks are split by splitlines()
+            yield from raw[pos:newline + 1].decode('utf-8').splitlines()
+            pos = newline + 1
+
+    def sha256(self):
+        return hashlib.sha256(self.raw).hexdigest()
+
+    def close(self):
+        if self.mapped:
+            self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+@contextmanager
+def open_document(source):
+    """Yield a NoteDocument for a path, or the document itself when one is passed in."""
+    if isinstance(source, NoteDocument):
+        yield source
+        return
+    doc = NoteDocument.load(source)
+    try:
+        yield doc
+    finally:
+        doc.close()
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import threading
+import queue
+import http.client
+from urllib.parse import urlsplit, unquote
+from services.markdown_to_json import SafeEncoder
+from utils.logger import logger
+from utils.state import load_state, save_state_atomic
+
+STATE_NAME = "obsidian-to-json.export.json"
+STATE_VERSION = 1
+# Per-item statuses worth sending again: the cluster is busy, not the document wrong
+RETRY_STATUSES = {429, 502, 503, 504}
+
+def redact(url):
+    """The URL without user:password, for the log and the state file."""
+    parts = urlsplit(url)
+    if not parts.username:
+        return url
+    return parts._replace(netloc=parts.netloc.rsplit("@", 1)[1]).geturl()
+
+class BulkConnection:
+    """One keep-alive HTTP(S) connection to a bulk endpoint, reopened after a failure."""
+
+    def __init__(self, url, timeout=30):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported export URL scheme: {url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path.rstrip("/") + "/_bulk"
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/x-ndjson", "Connection": "keep-alive"}
+        if parts.username:
+            token = f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode("utf-8")
+            self.headers["Authorization"] = "Basic " + base64.b64encode(token).decode("ascii")
+        self._conn = None
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def post(self, body):
+        """POST body to _bulk, returns (HTTP status, decoded JSON or None)."""
+        if self._conn is None:
+            self._conn = self._connect()
+        try:
+            self._conn.request("POST", self.path, body=body, headers=self.headers)
+            response = self._conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.getheader("Connection", "").lower() == "close":
+            self.close()
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+class BulkExporter:
+    """Sends converted notes to an Elasticsearch-compatible _bulk endpoint as NDJSON.
+
+    Same protocol as the indexes (is_current, update, remove, commit, close). Notes are batched by
+    count, bytes and age and sent from a background thread over one keep-alive connection. At most
+    max_pending batches wait for it: past that, update() blocks the main thread, which stops handing
+    work to the pool, so a slow backend slows the run down instead of filling memory.
+    The state file remembers what the backend acknowledged, so unchanged notes aren't sent again.
+    """
+
+    def __init__(self, url, output_dir, index="obsidian-notes", batch_docs=500, batch_bytes=5 * 1024 * 1024,
+                 flush_interval=2.0, max_retries=3, max_pending=2, timeout=30):
+        self.url = redact(url)
+        self.index = index
+        self.batch_docs = batch_docs
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.path = os.path.join(output_dir, STATE_NAME)
+        self.connection = BulkConnection(url, timeout=timeout)
+        self.notes = self._load()
+        # Notes whose last send failed, until one goes through
+        self.failed_notes = set()
+        self.sent = 0
+        self.deleted = 0
+        self.failed = 0
+        self.batches = 0
+        self._lines = []
+        self._items = []
+        self._bytes = 0
+        self._started = None
+        self._batch_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        # Held for every send, so commit() can wait for a timer flush too
+        self._send_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bulk-export", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        # Starting from scratch means every note is sent again
+        data = load_state(self.path, STATE_VERSION, "export state", "export_reset")
+        # Another backend or index has none of our notes yet
+        if data is None or data.get("url") != self.url or data.get("index") != self.index:
+            return {}
+        return data.get("notes", {})
+
+    @staticmethod
+    def doc_id(key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def is_current(self, md, sha256):
+        with self._state_lock:
+            return self.notes.get(os.path.abspath(md)) == sha256
+
+    def update(self, md, combined, sha256):
+        key = os.path.abspath(md)
+        action = {"index": {"_index": self.index, "_id": self.doc_id(key)}}
+        document = {"path": key, "sha256": sha256}
+        document.update(combined)
+        self._add(key, sha256, action, document)
+
+    def remove(self, md):
+        key = os.path.abspath(md)
+        with self._state_lock:
+            known = key in self.notes
+        if known:
+            self._add(key, None, {"delete": {"_index": self.index, "_id": self.doc_id(key)}})
+
+    def _add(self, key, sha256, action, document=None):
+        lines = json.dumps(action, separators=(',', ':')) + "\n"
+        if document is not None:
+            lines += json.dumps(document, ensure_ascii=False, cls=SafeEncoder, separators=(',', ':')) + "\n"
+        data = lines.encode('utf-8')
+        with self._batch_lock:
+            if not self._lines:
+                self._started = time.monotonic()
+            self._lines.append(data)
+            self._items.append((key, sha256))
+            self._bytes += len(data)
+            full = len(self._lines) >= self.batch_docs or self._bytes >= self.batch_bytes
+            batch = self._take() if full else None
+        if batch:
+            # Blocks while max_pending batches are queued: backpressure on the caller
+            self._queue.put(batch)
+
+    def _take(self):
+        batch = (self._lines, self._items)
+        self._lines, self._items, self._bytes, self._started = [], [], 0, None
+        return batch
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._queue.get(timeout=self.flush_interval / 2)
+            except queue.Empty:
+                with self._send_lock:
+                    with self._batch_lock:
+                        due = self._started is not None and time.monotonic() - self._started >= self.flush_interval
+                        batch = self._take() if due else None
+                    if batch:
+                        self._send(*batch)
+                if not batch and self._stop.is_set():
+                    return
+                continue
+            try:
+                if batch is not None:
+                    with self._send_lock:
+                        self._send(*batch)
+            finally:
+                self._queue.task_done()
+
+    def _send(self, lines, items):
+        pending = list(range(len(items)))
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 10))
+            body = b"".join(lines[i] for i in pending)
+            try:
+                status, result = self.connection.post(body)
+            except (OSError, http.client.HTTPException) as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+            if status == 429 or status >= 500:
+                error = f"HTTP {status}"
+                continue
+            if status >= 400 or not isinstance(result, dict):
+                error = f"HTTP {status}"
+                break
+            retry = []
+            answers = result.get("items", [])
+            for i, item in zip(pending, answers):
+                outcome = next(iter(item.values()), {})
+                item_status = outcome.get("status", 500)
+                # A note deleted before it ever reached the backend is gone either way
+                if item_status < 300 or (item_status == 404 and items[i][1] is None):
+                    self._acknowledge(*items[i])
+                elif item_status in RETRY_STATUSES:
+                    retry.append(i)
+                else:
+                    self._fail(items[i][0], f"{item_status} {outcome.get('error')}")
+            # Items the response doesn't account for were not acknowledged
+            for i in pending[len(answers):]:
+                self._fail(items[i][0], f"missing from the _bulk response ({len(answers)} items for {len(pending)})")
+            self.batches += 1
+            if not retry:
+                return
+            pending = retry
+            error = f"{len(retry)} items throttled"
+        for i in pending:
+            self._fail(items[i][0], error)
+
+    def _acknowledge(self, key, sha256):
+        with self._state_lock:
+            if sha256 is None:
+                self.notes.pop(key, None)
+                self.deleted += 1
+            else:
+                self.notes[key] = sha256
+                self.sent += 1
+            self.failed_notes.discard(key)
+
+    def _fail(self, key, reason):
+        # Left out of the state: the note is converted and sent again on the next run
+        with self._state_lock:
+            self.failed += 1
+            self.failed_notes.add(key)
+        logger.error(f"Export failed for {key}", extra={
+            "status": "export_failed",
+            "destination_path": self.url,
+            "error_details": reason
+        })
+
+    def commit(self):
+        """Send what is buffered, wait for the backend, then save what it acknowledged."""
+        with self._batch_lock:
+            batch = self._take() if self._lines else None
+        if batch:
+            self._queue.put(batch)
+        self._queue.join()
+        # A batch the flush timer took may still be on its way
+        with self._send_lock:
+            pass
+        if not (self.sent or self.deleted or self.failed) and os.path.exists(self.path):
+            return
+        with self._state_lock:
+            data = {"version": STATE_VERSION, "url": self.url, "index": self.index, "notes": dict(self.notes)}
+        save_state_atomic(self.path, data)
+        logger.info(f"Export: {self.sent} notes sent, {self.deleted} deleted, {self.failed} failed in {self.batches} batches", extra={
+            "status": "export",
+            "destination_path": self.url,
+            "files_written": self.sent,
+            "files_failed": self.failed
+        })
+        self.sent = self.deleted = self.failed = self.batches = 0
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.connection.close()
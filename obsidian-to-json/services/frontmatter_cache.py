@@ -0,0 +1,132 @@
+import os
+import json
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+from utils.logger import logger
+from utils.state import load_state, save_state_atomic
+
+CACHE_NAME = ".obsidian-to-json.frontmatter-cache.json"
+CACHE_VERSION = 1
+CACHE_MAXSIZE = 50000
+
+class _Uncacheable(Exception):
+    pass
+
+def _encode_value(value):
+    # YAML gives us dates and datetimes on top of plain JSON types, everything else is not worth caching
+    if isinstance(value, dict):
+        if not all(isinstance(k, str) for k in value):
+            raise _Uncacheable()
+        return {k: _encode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode_value(v) for v in value]
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    raise _Uncacheable()
+
+def _decode_hook(obj):
+    if len(obj) == 1:
+        if "__date__" in obj:
+            return datetime.date.fromisoformat(obj["__date__"])
+        if "__datetime__" in obj:
+            return datetime.datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+def cache_key(frontmatter_text):
+    return hashlib.blake2b(frontmatter_text.encode('utf-8'), digest_size=16).hexdigest()
+
+class FrontmatterCache:
+    """Parsed frontmatter keyed by a hash of its text: in-memory LRU, optionally persisted in the output folder.
+
+    Values are kept JSON-encoded, so every hit hands out a fresh dict.
+    """
+
+    def __init__(self, maxsize=CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self.path = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Entries put since take_updates(), only kept once a worker process asked for them
+        self._added = None
+        self._lock = threading.Lock()
+
+    def attach(self, output_dir):
+        """Load the on-disk cache from output_dir, save() writes it back there."""
+        self.path = os.path.join(output_dir, CACHE_NAME)
+        data = load_state(self.path, CACHE_VERSION, "frontmatter cache", "frontmatter_cache_reset")
+        if data:
+            with self._lock:
+                self._entries.update(data.get("entries", {}))
+                self._trim()
+
+    def get(self, frontmatter_text):
+        key = cache_key(frontmatter_text)
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is None:
+                self.misses += 1
+                return key, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return key, json.loads(encoded, object_hook=_decode_hook)
+
+    def put(self, key, value):
+        try:
+            encoded = json.dumps(_encode_value(value), ensure_ascii=False, separators=(',', ':'))
+        except _Uncacheable:
+            return
+        with self._lock:
+            self._entries[key] = encoded
+            self._entries.move_to_end(key)
+            self._trim()
+            if self._added is not None:
+                self._added[key] = encoded
+
+    def take_updates(self):
+        """Entries added and hits/misses counted since the last call, for a worker process to send back.
+
+        The parent gives them to merge(), so what workers parse ends up in the saved cache.
+        """
+        with self._lock:
+            updates = {"entries": self._added or {}, "hits": self.hits, "misses": self.misses}
+            self._added = {}
+            self.hits = self.misses = 0
+        return updates
+
+    def merge(self, updates):
+        with self._lock:
+            for key, encoded in updates["entries"].items():
+                self._entries[key] = encoded
+                self._entries.move_to_end(key)
+            self._trim()
+            self.hits += updates["hits"]
+            self.misses += updates["misses"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def _trim(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def save(self):
+        if self.path is None:
+            return None
+        with self._lock:
+            save_state_atomic(self.path, {"version": CACHE_VERSION, "entries": self._entries})
+        logger.info(f"Frontmatter cache: {self.hits} hits, {self.misses} misses", extra={
+            "status": "frontmatter_cache",
+            "destination_path": self.path
+        })
+        return self.path
+
+frontmatter_cache = FrontmatterCache()
@@ -0,0 +1,124 @@
+import os
+from utils.state import load_state, save_state_atomic
+
+STATE_NAME = ".obsidian-to-json.git-state.json"
+STATE_VERSION = 1
+
+class GitError(Exception):
+    """git answered with an error (not a repository, unknown revision...)."""
+
+def _git(root, *args):
+    # Runs that never talk to git don't pay for subprocess
+    import subprocess
+    proc = subprocess.run(["git", "-C", root, *args], capture_output=True)
+    if proc.returncode:
+        raise GitError(proc.stderr.decode('utf-8', errors='replace').strip() or f"git {args[0]} exited with {proc.returncode}")
+    return proc.stdout
+
+def repo_root(folder):
+    """Top-level folder of the git repository holding folder, or None when it isn't in one."""
+    try:
+        return os.fsdecode(_git(folder, "rev-parse", "--show-toplevel").strip()) or None
+    except (OSError, GitError):
+        return None
+
+def resolve(root, rev):
+    """Commit hash of rev (HEAD, a tag, HEAD~3, ...), or None when git doesn't know it."""
+    try:
+        return _git(root, "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}").decode().strip() or None
+    except (OSError, GitError):
+        return None
+
+class GitChanges:
+    """Notes that differ between a commit and the working tree, as absolute paths."""
+
+    def __init__(self):
+        self.changed = set()
+        self.deleted = set()
+        self.renamed = []
+
+    def __len__(self):
+        return len(self.changed) + len(self.deleted)
+
+def changed_notes(root, since, folder, path_filter):
+    """Added, modified, renamed and deleted notes under folder since the commit since.
+
+    Compared with the working tree, so uncommitted edits and untracked notes count too.
+    A rename is a deletion of the old path plus a change of the new one.
+    """
+    folder = os.path.abspath(folder)
+    # git answers with real paths, the manifest keeps the vault path as configured (maybe a symlink)
+    real_folder = os.path.realpath(folder)
+    pathspec = os.path.relpath(real_folder, root)
+    changes = GitChanges()
+
+    def accepted(rel):
+        path = os.path.join(folder, os.path.relpath(os.path.join(root, os.fsdecode(rel)), real_folder))
+        return path if path_filter.accept_path(path, folder) else None
+
+    fields = _git(root, "diff", "--name-status", "-z", "-M", "--no-ext-diff", since, "--", pathspec).split(b"\0")
+    i = 0
+    while i < len(fields) - 1:
+        status = fields[i][:1]
+        if status in (b"R", b"C"):
+            old, new = accepted(fields[i + 1]), accepted(fields[i + 2])
+            i += 3
+            if old and status == b"R":
+                changes.deleted.add(old)
+            if new:
+                changes.changed.add(new)
+            if old and new and status == b"R":
+                changes.renamed.append((old, new))
+            continue
+        path = accepted(fields[i + 1])
+        i += 2
+        if path is None:
+            continue
+        if status == b"D":
+            changes.deleted.add(path)
+        else:
+            changes.changed.add(path)
+    for rel in _git(root, "ls-files", "--others", "--exclude-standard", "-z", "--", pathspec).split(b"\0"):
+        if rel:
+            path = accepted(rel)
+            if path:
+                changes.changed.add(path)
+    return changes
+
+class GitState:
+    """Commit of the last run, plus the notes it saw with uncommitted changes or failed on.
+
+    Those are looked at again next time: an edit that is reverted before being committed
+    doesn't show up in a diff against the commit, but its output still has to follow, and
+    a note that failed is unchanged in git but still has to be converted.
+    """
+
+    def __init__(self, output_dir, head=None, pending=None):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, STATE_NAME)
+        self.head = head
+        self.pending = pending or []
+
+    @classmethod
+    def load(cls, output_dir):
+        data = load_state(os.path.join(output_dir, STATE_NAME), STATE_VERSION, "git state", "git_state_reset")
+        if data is None:
+            # No recorded commit: the next run scans the whole vault
+            return cls(output_dir)
+        return cls(output_dir, data.get("head"), data.get("pending"))
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def record(self, root, folder, path_filter, retry=()):
+        """Remember HEAD, the notes that differ from it right now and the notes in retry."""
+        self.head = resolve(root, "HEAD")
+        if self.head is None:
+            # No commit yet: nothing to diff against, the next run scans the whole vault
+            self.pending = []
+            return
+        changes = changed_notes(root, self.head, folder, path_filter)
+        self.pending = sorted(changes.changed | changes.deleted | {os.path.abspath(md) for md in retry})
+
+    def save(self):
+        return save_state_atomic(self.path, {"version": STATE_VERSION, "head": self.head, "pending": self.pending})
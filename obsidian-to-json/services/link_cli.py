@@ -0,0 +1,51 @@
+import os
+import json
+import argparse
+from services.link_index import INDEX_NAME, LinkIndex, note_name
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m obsidian-to-json links", description="Query the tag and wikilink index built with --link-index.")
+    parser.add_argument('--tag', type=str, default=None, help='Notes with this tag or one of its children (platform also finds platform/gcp).')
+    parser.add_argument('--backlinks', type=str, default=None, metavar='NOTE', help='Notes linking to NOTE ([[NOTE]] anywhere in the note).')
+    parser.add_argument('--note', type=str, default=None, metavar='PATH', help='Tags, outgoing links and backlinks of one note.')
+    parser.add_argument('--tags', action='store_true', help='Every tag with its number of notes.')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON.')
+    parser.add_argument('--dir', type=str, default=None, help='Folder holding the index. Default: OUTPUT_FOLDER')
+    args = parser.parse_args(argv)
+
+    output_dir = args.dir or os.getenv("OUTPUT_FOLDER") or "output"
+    if not os.path.exists(os.path.join(output_dir, INDEX_NAME)):
+        print(f" ❌ No link index in {output_dir}, run the converter with --link-index first")
+        return 1
+    index = LinkIndex(output_dir, readonly=True)
+
+    if args.tag:
+        result = index.notes_with_tag(args.tag)
+    elif args.backlinks:
+        result = index.linking_to(args.backlinks)
+    elif args.note:
+        path = os.path.abspath(args.note)
+        entry = index.note(path)
+        if entry is None:
+            print(f" ❌ {path} is not in the index")
+            return 1
+        result = {"tags": entry["tags"], "links": entry["links"], "backlinks": index.linking_to(note_name(path))}
+    elif args.tags:
+        result = index.tag_counts()
+    else:
+        parser.error("give --tag, --backlinks, --note or --tags")
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    elif isinstance(result, list):
+        for path in result:
+            print(path)
+    elif args.tags:
+        for tag, count in result.items():
+            print(f"{count:>6}  {tag}")
+    else:
+        for key, values in result.items():
+            print(f"{key}:")
+            for value in values:
+                print(f"  {value}")
+    return 0
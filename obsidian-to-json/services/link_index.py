@@ -0,0 +1,171 @@
+import os
+import re
+import sqlite3
+from utils.logger import logger
+
+INDEX_NAME = "obsidian-to-json.links.sqlite"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (tag, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS links (
+    target TEXT NOT NULL,
+    target_name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (target, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS notes_name ON notes(name);
+CREATE INDEX IF NOT EXISTS tags_path ON tags(path);
+CREATE INDEX IF NOT EXISTS links_path ON links(path);
+CREATE INDEX IF NOT EXISTS links_name ON links(target_name);
+"""
+
+# [[target]], [[target|alias]], [[target#heading]]
+WIKILINK_RE = re.compile(r'\[\[([^\[\]|#]+)(?:#[^\[\]|]*)?(?:\|[^\[\]]*)?\]\]')
+TAG_KEYS = ("tags", "tag")
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+def note_tags(frontmatter):
+    tags = set()
+    for key in TAG_KEYS:
+        value = frontmatter.get(key)
+        if isinstance(value, str):
+            value = re.split(r'[,\s]+', value)
+        for tag in value if isinstance(value, list) else ():
+            if isinstance(tag, str) and tag.strip().lstrip('#'):
+                tags.add(tag.strip().lstrip('#'))
+    return sorted(tags)
+
+def note_links(combined):
+    """Wikilink targets anywhere in the note (frontmatter values and structure text), without .md."""
+    links = set()
+    for text in _strings(combined):
+        if "[[" not in text:
+            continue
+        for target in WIKILINK_RE.findall(text):
+            target = target.strip()
+            if target.endswith(".md"):
+                target = target[:-3]
+            if target:
+                links.add(target)
+    return sorted(links)
+
+def note_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+class LinkIndex:
+    """SQLite tables of each note's tags and wikilink targets, indexed both ways.
+
+    A changed note only has its own rows swapped, and lookups (tag → notes, target → linking
+    notes) go through the indexes instead of loading the whole graph.
+    """
+
+    def __init__(self, output_dir, readonly=False):
+        self.path = os.path.join(output_dir, INDEX_NAME)
+        self.updated = 0
+        self.removed = 0
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._current = {}
+            return
+        os.makedirs(output_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        # Readers (the links CLI, a dashboard) keep working while a run writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS notes; DROP TABLE IF EXISTS tags; DROP TABLE IF EXISTS links;")
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._current = dict(self.conn.execute("SELECT path, sha256 FROM notes"))
+
+    def is_current(self, md, sha256):
+        return self._current.get(os.path.abspath(md)) == sha256
+
+    def _delete(self, key):
+        self.conn.execute("DELETE FROM tags WHERE path = ?", (key,))
+        self.conn.execute("DELETE FROM links WHERE path = ?", (key,))
+        self.conn.execute("DELETE FROM notes WHERE path = ?", (key,))
+
+    def update(self, md, combined, sha256):
+        key = os.path.abspath(md)
+        self._delete(key)
+        self.conn.execute("INSERT INTO notes (path, sha256, name) VALUES (?, ?, ?)", (key, sha256, note_name(key)))
+        self.conn.executemany("INSERT INTO tags (tag, path) VALUES (?, ?)", ((tag, key) for tag in note_tags(combined["frontmatter"])))
+        self.conn.executemany(
+            "INSERT INTO links (target, target_name, path) VALUES (?, ?, ?)",
+            ((target, target.rsplit("/", 1)[-1], key) for target in note_links(combined))
+        )
+        self._current[key] = sha256
+        self.updated += 1
+
+    def remove(self, md):
+        key = os.path.abspath(md)
+        self._delete(key)
+        if self._current.pop(key, None) is not None:
+            self.removed += 1
+
+    def commit(self):
+        self.conn.commit()
+        if self.updated or self.removed:
+            logger.info(f"Link index: {self.updated} notes updated, {self.removed} removed", extra={
+                "status": "link_index",
+                "destination_path": self.path
+            })
+        self.updated = self.removed = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def note(self, md):
+        """{"tags", "links"} of one note, None when it isn't in the index."""
+        key = os.path.abspath(md)
+        if self.conn.execute("SELECT 1 FROM notes WHERE path = ?", (key,)).fetchone() is None:
+            return None
+        return {
+            "tags": [row[0] for row in self.conn.execute("SELECT tag FROM tags WHERE path = ? ORDER BY tag", (key,))],
+            "links": [row[0] for row in self.conn.execute("SELECT target FROM links WHERE path = ? ORDER BY target", (key,))]
+        }
+
+    def tag_counts(self):
+        """Every tag with its number of notes, by tag."""
+        return dict(self.conn.execute("SELECT tag, COUNT(*) FROM tags GROUP BY tag ORDER BY tag"))
+
+    def notes_with_tag(self, tag):
+        """Notes tagged tag or any of its children (platform → platform/gcp)."""
+        tag = tag.lstrip('#')
+        # Children sort between "tag/" and "tag0", '0' being the character after '/'
+        rows = self.conn.execute(
+            "SELECT DISTINCT path FROM tags WHERE tag = ? OR (tag > ? AND tag < ?) ORDER BY path",
+            (tag, tag + "/", tag + "0")
+        )
+        return [row[0] for row in rows]
+
+    def linking_to(self, target):
+        """Notes linking to target, by note name or vault-relative path, with or without .md."""
+        target = target[:-3] if target.endswith(".md") else target
+        # [[folder/note]] and [[note]] point at the same note
+        rows = self.conn.execute(
+            "SELECT DISTINCT path FROM links WHERE target = ? OR target_name = ? ORDER BY path",
+            (target, target.rsplit("/", 1)[-1])
+        )
+        return [row[0] for row in rows]
@@ -0,0 +1,45 @@
+import json
+import argparse
+from services.log_summary import summarize, parse_since
+from utils.logger import LOG_FILE
+
+def _seconds_between(started, ended):
+    from datetime import datetime
+    parse = lambda stamp: datetime.fromisoformat(stamp.replace("Z", "+00:00"))
+    return (parse(ended) - parse(started)).total_seconds()
+
+def _print_run(run):
+    duration = _seconds_between(run["started"], run["ended"]) if run["started"] and run["ended"] else 0
+    print(f" 📜 {run['execution_id']}  {run['started']} → {run['ended']} ({duration:.1f} s)  env={run['env']} trigger={run['trigger']}")
+    for status, totals in run["results"].items():
+        counts = ", ".join(f"{field[len('files_'):]} {value}" for field, value in totals.items() if value)
+        print(f"    {status}: {counts or 'nothing'}")
+    errors = run["levels"]["error"] + run["levels"]["critical"]
+    warnings = run["levels"]["warning"]
+    print(f"    {errors} errors, {warnings} warnings")
+    for status, count in run["statuses"].most_common():
+        print(f"    {count:>8}  {status}")
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m obsidian-to-json summarize", description="Summarize runs from the JSON log, rotated segments included.")
+    parser.add_argument('--runs', type=int, default=1, help='How many of the latest runs to show. Default: 1')
+    parser.add_argument('--since', type=str, default=None, help='Every run since a time: 24h, 7d, 90m, or a UTC date like 2026-10-18.')
+    parser.add_argument('--execution-id', type=str, default=None, help='Only this run.')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON.')
+    parser.add_argument('--log', type=str, default=LOG_FILE, help=f'Live log file, archives are found next to it. Default: {LOG_FILE}')
+    args = parser.parse_args(argv)
+
+    try:
+        since = parse_since(args.since) if args.since else None
+    except ValueError as e:
+        parser.error(str(e))
+    runs = summarize(args.log, runs=max(1, args.runs), since=since, execution_id=args.execution_id)
+    if not runs:
+        print(f" ❌ No runs found in {args.log}")
+        return 1
+    if args.json:
+        print(json.dumps(runs, ensure_ascii=False, indent=2))
+        return 0
+    for run in runs:
+        _print_run(run)
+    return 0
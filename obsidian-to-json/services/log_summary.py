@@ -0,0 +1,92 @@
+import os
+import json
+import gzip
+import time
+import calendar
+from collections import Counter
+from utils.logger import log_archives
+
+# Records whose counters make up a run's result line
+RESULT_STATUSES = ("scan_complete", "indexed_combined", "watch_batch", "export")
+RESULT_FIELDS = ("files_scanned", "files_indexed", "files_cached", "files_written", "files_unchanged", "files_failed")
+
+def parse_since(value):
+    """Epoch seconds from "90m", "24h", "7d" (ago) or a UTC date/time like 2026-10-18 or 2026-10-18T06:00."""
+    units = {"m": 60, "h": 3600, "d": 86400}
+    if value[-1:] in units and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * units[value[-1]]
+    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+        try:
+            return calendar.timegm(time.strptime(value.rstrip("Z"), fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"not a duration (24h) or a date (2026-10-18): {value}")
+
+def _iso(epoch):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(epoch))
+
+def segments(log_file, since=None):
+    """Live log first, then archives newest first; archives ending before since are never opened."""
+    if os.path.exists(log_file):
+        yield log_file
+    for path, _, last in reversed(log_archives(log_file)):
+        if since is not None and last < since:
+            break
+        yield path
+
+def iter_records(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Half-written last line of a live log, or a foreign line
+                continue
+
+def _new_run(record):
+    return {
+        "execution_id": record.get("execution_id"),
+        "started": record.get("timestamp"),
+        "ended": record.get("timestamp"),
+        "env": record.get("env"),
+        "trigger": record.get("trigger"),
+        "statuses": Counter(),
+        "levels": Counter(),
+        "results": {}
+    }
+
+def summarize(log_file, runs=1, since=None, execution_id=None):
+    """Per-run counts by status and level, newest run first.
+
+    Segments are read newest first and reading stops as soon as the newest runs asked for
+    are complete (their startup record was seen), so older history is never parsed.
+    With since, every run in the window is returned instead.
+    """
+    since_iso = _iso(since) if since is not None else None
+    executions = {}
+    for path in segments(log_file, since):
+        for record in iter_records(path):
+            stamp = record.get("timestamp", "")
+            if since_iso and stamp < since_iso:
+                continue
+            if execution_id and record.get("execution_id") != execution_id:
+                continue
+            run = executions.get(record.get("execution_id"))
+            if run is None:
+                run = executions[record.get("execution_id")] = _new_run(record)
+            run["started"] = min(run["started"] or stamp, stamp)
+            run["ended"] = max(run["ended"] or stamp, stamp)
+            status = record.get("status", "unknown")
+            run["statuses"][status] += 1
+            run["levels"][record.get("level", "info")] += 1
+            if status in RESULT_STATUSES:
+                totals = run["results"].setdefault(status, Counter())
+                for field in RESULT_FIELDS:
+                    totals[field] += record.get(field, 0)
+        if since is None and not execution_id:
+            complete = [run for run in executions.values() if run["statuses"]["startup"]]
+            if len(complete) >= runs:
+                break
+    ordered = sorted(executions.values(), key=lambda run: run["started"] or "", reverse=True)
+    return ordered if since is not None or execution_id else ordered[:runs]
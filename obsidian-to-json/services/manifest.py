@@ -0,0 +1,129 @@
+import os
+import hashlib
+import threading
+from utils.state import load_state, save_state_atomic
+
+MANIFEST_NAME = ".obsidian-to-json.manifest.json"
+MANIFEST_VERSION = 1
+# Source note → output, for readers: one dict lookup instead of guessing the layout
+OUTPUTS_NAME = "obsidian-to-json.outputs.json"
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def make_entry(md, json_path, doc=None):
+    st = doc.stat if doc else os.stat(md)
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": doc.sha256() if doc else hash_file(md),
+        "json_path": json_path
+    }
+
+def remove_output(json_path, output_dir):
+    """Delete a note's output, then the folders it leaves empty (mirror and hashed layouts)."""
+    if not os.path.exists(json_path):
+        return
+    os.remove(json_path)
+    root = os.path.abspath(output_dir)
+    folder = os.path.dirname(os.path.abspath(json_path))
+    while folder != root and folder.startswith(root + os.sep):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            break
+        folder = os.path.dirname(folder)
+
+class Manifest:
+    """Per-note record of what was converted last run: path, size, mtime, content hash and output path."""
+
+    def __init__(self, output_dir, entries=None):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.entries = entries or {}
+        # Outputs that a reconverted note no longer uses (its name or the layout changed)
+        self.replaced = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, output_dir):
+        data = load_state(os.path.join(output_dir, MANIFEST_NAME), MANIFEST_VERSION, "manifest", "manifest_reset")
+        return cls(output_dir, data.get("files", {}) if data else None)
+
+    def get(self, md):
+        return self.entries.get(os.path.abspath(md))
+
+    def is_unchanged(self, md, json_path, doc=None):
+        """True when md was converted before, its output still exists and its content did not change."""
+        key = os.path.abspath(md)
+        entry = self.entries.get(key)
+        if not entry or entry.get("json_path") != json_path or not os.path.exists(json_path):
+            return False
+        st = doc.stat if doc else os.stat(md)
+        if st.st_size != entry["size"]:
+            return False
+        if st.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        # Touched but maybe not edited (sync clients love doing this), fall back to the hash
+        digest = doc.sha256() if doc else hash_file(md)
+        if digest != entry["sha256"]:
+            return False
+        with self._lock:
+            entry["mtime_ns"] = st.st_mtime_ns
+        return True
+
+    def record(self, md, json_path, doc=None):
+        self.record_entry(md, make_entry(md, json_path, doc))
+
+    def record_entry(self, md, entry):
+        with self._lock:
+            old = self.entries.get(os.path.abspath(md))
+            if old and old.get("json_path") and old["json_path"] != entry["json_path"]:
+                self.replaced.add(old["json_path"])
+            self.entries[os.path.abspath(md)] = entry
+
+    def prune_deleted(self, dry_run=False, remove_outputs=True, candidates=None):
+        """Drop entries (and their JSON outputs) whose source note no longer exists.
+
+        candidates limits the check to those notes (git tells which ones were deleted),
+        instead of a stat of every entry.
+        """
+        removed = []
+        with self._lock:
+            keys = self.entries.keys() if candidates is None else {os.path.abspath(md) for md in candidates} & self.entries.keys()
+            outputs = set()
+            for key in [k for k in keys if not os.path.exists(k)]:
+                entry = self.entries.pop(key)
+                if entry.get("json_path"):
+                    outputs.add(entry["json_path"])
+                removed.append(key)
+            if remove_outputs and not dry_run:
+                # A note moved to another folder keeps its flat-layout output, now owned by the new path.
+                # Stale per-note outputs left behind by a layout switch go too; bundles (.jsonl) are the
+                # jsonl sink's to clean up.
+                in_use = {entry.get("json_path") for entry in self.entries.values()}
+                for json_path in outputs - in_use:
+                    remove_output(json_path, self.output_dir)
+                for json_path in self.replaced - in_use:
+                    if json_path.endswith(".json"):
+                        remove_output(json_path, self.output_dir)
+            self.replaced = set()
+        return removed
+
+    def save(self):
+        with self._lock:
+            return save_state_atomic(self.path, {"version": MANIFEST_VERSION, "files": self.entries})
+
+    def save_outputs(self):
+        """Write OUTPUTS_NAME: source path → output path relative to the output folder."""
+        path = os.path.join(self.output_dir, OUTPUTS_NAME)
+        with self._lock:
+            outputs = {
+                md: os.path.relpath(entry["json_path"], self.output_dir)
+                for md, entry in sorted(self.entries.items()) if entry.get("json_path")
+            }
+        return save_state_atomic(path, {"version": MANIFEST_VERSION, "outputs": outputs})
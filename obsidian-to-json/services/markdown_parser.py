@@ -1,32 +1,45 @@
-import re
 import json
 import os
 import time
 from utils.logger import logger
-import yaml
+from services.document import open_document
+from services.frontmatter_cache import frontmatter_cache
 
-def extract_frontmatter(file_path):
+_yaml_load = None
+
+def load_yaml(text):
+    global _yaml_load
+    if _yaml_load is None:
+        # Imported with the first header to parse, runs where every header hits the cache never pay for it
+        import yaml
+        # libyaml's C loader is several times faster, PyYAML builds without it fall back to the pure-Python one
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        _yaml_load = lambda text: yaml.load(text, Loader=loader)
+    return _yaml_load(text)
+
+def extract_frontmatter(source):
+    file_path = getattr(source, "path", source)
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # Extract the part between ---
-        frontmatter_pattern = r'^---\s*\n(.*?)\n---\s*\n'
-        match = re.search(frontmatter_pattern, content, re.DOTALL)
+        # The frontmatter span between --- is located once, when the note is loaded
+        with open_document(source) as doc:
+            frontmatter_text = doc.frontmatter_text
         
-        if not match:
+        if frontmatter_text is None:
             logger.warning(f"No frontmatter found in {file_path}", extra={"status": "no_frontmatter"})
             return {}
-        
-        frontmatter_text = match.group(1)
 
-        # Use yaml.safe_load for actual parsing
-        frontmatter_dict = yaml.safe_load(frontmatter_text)
+        # Identical headers (same text, same hash) are parsed once, across runs when the cache is attached
+        key, frontmatter_dict = frontmatter_cache.get(frontmatter_text)
+        if frontmatter_dict is not None:
+            return frontmatter_dict
+
+        frontmatter_dict = load_yaml(frontmatter_text)
         
         if not isinstance(frontmatter_dict, dict):
             logger.warning(f"Frontmatter is not a valid YAML dictionary in {file_path}", extra={"status": "invalid_frontmatter"})
             return {}
 
+        frontmatter_cache.put(key, frontmatter_dict)
         return frontmatter_dict
 
     except Exception as e:
@@ -1,8 +1,13 @@
 import re
 import json
 import os
-from utils.logger import logger
-import jsonschema
+import hashlib
+import random
+import logging
+import functools
+import threading
+from utils.logger import logger, phase_timings
+from services.document import open_document
 
 class SafeEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -11,100 +16,126 @@ class SafeEncoder(json.JSONEncoder):
         except TypeError:
             return str(obj)
 
-def extract_markdown_structure(file_path):
-    try:
-        logger.info(f"Processing markdown file {file_path}", extra={"status": "start_processing"})
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+CAPTURE_MODES = frozenset(['flags', 'commands', 'code', 'description', 'bullets', 'links'])
+BULLET_RE = re.compile(r'-\s+`([^`]+)`:\s*(.*)')
+LINK_RE = re.compile(r'-\s+\[([^\]]+)\]\(([^)]+)\)')
 
-        # Remove frontmatter
-        content = re.sub(r'^---.*?---\s*\n', '', content, flags=re.DOTALL)
+def _missing_section():
+    # Content before the first '# ' heading has nowhere to go, same failure as the old dict lookup
+    raise KeyError(None)
 
-        result = {}
-        current_section = None
-        current_subsection = None
-        capture_mode = None
-        buffer = []
-        in_code_block = False
-        code_language = None
-
-        lines = content.splitlines()
-
-        for line in lines:
-            stripped = line.strip()
-
-            # Handle code blocks
-            if stripped.startswith('```'):
-                if not in_code_block:
-                    if len(stripped) > 3:
-                        code_language = stripped[3:]
-                    in_code_block = True
-                    if buffer:
-                        _flush_buffer(result[current_section]["sections"][current_subsection] if current_subsection 
-                                   else result[current_section], capture_mode, buffer, current_section, current_subsection)
-                    buffer = []
-                    capture_mode = "code"
-                    continue
-                else:
-                    in_code_block = False
-                    if buffer:
-                        target = result[current_section]["sections"][current_subsection] if current_subsection else result[current_section]
-                        if "code_blocks" not in target:
-                            target["code_blocks"] = []
-                        target["code_blocks"].append({
-                            "language": code_language,
-                            "content": '\n'.join(buffer)
-                        })
-                    buffer = []
-                    code_language = None
-                    capture_mode = None
-                    continue
-
-            if in_code_block:
-                buffer.append(line)
-                continue
-
-            # Handle main sections and subsections
-            if stripped.startswith('# '):
-                if current_section and buffer:
-                    _flush_buffer(result[current_section], capture_mode, buffer, current_section, None)
-
-                current_section = stripped[2:].strip()
-                result[current_section] = {"description": "", "sections": {}}
-                current_subsection = None
-                capture_mode = None
-                buffer = []
-                logger.info(f"New main section: {current_section}", extra={"status": "new_section"})
+def iter_markdown_sections(lines):
+    """Yield (title, section) for each '# ' section as soon as it is complete.
 
-            elif stripped.startswith('## '):
-                if current_subsection and buffer:
-                    _flush_buffer(result[current_section]["sections"][current_subsection], capture_mode, buffer, current_section, current_subsection)
-                current_subsection = stripped[3:].strip()
-                result[current_section]["sections"][current_subsection] = {}
-                capture_mode = None
-                buffer = []
-                logger.info(f"New subsection: {current_subsection}", extra={"status": "new_subsection"})
+    A repeated title is yielded again, extract_markdown_structure keeps the last one.
+    Raises KeyError for content before the first section, like the structure dict lookup did.
+    """
+    debug = logger.isEnabledFor(logging.DEBUG)
+    current_section = None
+    current_subsection = None
+    section = None  # dict of the current '# ' section
+    target = None   # where text is flushed: current subsection, or the section itself
+    capture_mode = None
+    buffer = []
+    in_code_block = False
+    code_language = None
+
+    # Single sweep: each line is classified by its first two characters, then handled
+    for line in lines:
+        stripped = line.strip()
+        head = stripped[:2]
 
-            # Handle special flags
-            elif stripped.startswith('**') and stripped.endswith('**'):
+        # Handle code blocks
+        if head == '``' and stripped.startswith('```'):
+            if target is None and buffer:
+                _missing_section()
+            if not in_code_block:
+                if len(stripped) > 3:
+                    code_language = stripped[3:]
+                in_code_block = True
                 if buffer:
-                    target = result[current_section]["sections"][current_subsection] if current_subsection else result[current_section]
                     _flush_buffer(target, capture_mode, buffer, current_section, current_subsection)
-                
-                flag_type = stripped.strip('*').lower()
-                if flag_type in ['flags', 'commands', 'code', 'description', 'bullets', 'links']:
-                    capture_mode = flag_type
-                    buffer = []
-                    logger.info(f"Switching capture mode to {capture_mode}", extra={"status": "capture_mode"})
+                buffer = []
+                capture_mode = "code"
+            else:
+                in_code_block = False
+                if buffer:
+                    target.setdefault("code_blocks", []).append({
+                        "language": code_language,
+                        "content": '\n'.join(buffer)
+                    })
+                buffer = []
+                code_language = None
+                capture_mode = None
+            continue
+
+        if in_code_block:
+            buffer.append(line)
+
+        # Handle main sections and subsections
+        elif head == '# ':
+            if current_section and buffer:
+                _flush_buffer(section, capture_mode, buffer, current_section, None)
+            if section is not None:
+                yield current_section, section
+
+            current_section = stripped[2:].strip()
+            section = target = {"description": "", "sections": {}}
+            current_subsection = None
+            capture_mode = None
+            buffer = []
+            if debug:
+                logger.debug("New main section: %s", current_section, extra={"status": "new_section"})
+
+        elif head == '##' and stripped.startswith('## '):
+            if section is None:
+                _missing_section()
+            if current_subsection and buffer:
+                _flush_buffer(target, capture_mode, buffer, current_section, current_subsection)
+            current_subsection = stripped[3:].strip()
+            target = section["sections"][current_subsection] = {}
+            capture_mode = None
+            buffer = []
+            if debug:
+                logger.debug("New subsection: %s", current_subsection, extra={"status": "new_subsection"})
 
-            elif stripped:
-                buffer.append(line)
+        # Handle special flags
+        elif head == '**' and stripped.endswith('**'):
+            if buffer:
+                if target is None:
+                    _missing_section()
+                _flush_buffer(target, capture_mode, buffer, current_section, current_subsection)
+            
+            flag_type = stripped.strip('*').lower()
+            if flag_type in CAPTURE_MODES:
+                capture_mode = flag_type
+                buffer = []
+                if debug:
+                    logger.debug("Switching capture mode to %s", capture_mode, extra={"status": "capture_mode"})
+
+        elif stripped:
+            buffer.append(line)
+
+    # Flush any remaining buffer
+    if buffer:
+        if target is None:
+            _missing_section()
+        _flush_buffer(target, capture_mode, buffer, current_section, current_subsection)
+    if section is not None:
+        yield current_section, section
+
+def extract_markdown_structure(source):
+    file_path = getattr(source, "path", source)
+    try:
+        logger.info(f"Processing markdown file {file_path}", extra={"status": "start_processing"})
+        
+        # Body span already excludes the frontmatter
+        with open_document(source) as doc:
+            content = doc.body_text
 
-        # Flush any remaining buffer
-        if buffer:
-            target = result[current_section]["sections"][current_subsection] if current_subsection else result[current_section]
-            _flush_buffer(target, capture_mode, buffer, current_section, current_subsection)
+        result = {}
+        for title, section in iter_markdown_sections(content.splitlines()):
+            result[title] = section
 
         logger.info(f"Finished processing markdown file {file_path}", extra={"status": "finished_processing"})
         return result
@@ -124,28 +155,28 @@ def _flush_buffer(target, mode, buffer, section_name=None, subsection_name=None)
 
     if (section_name and section_name.lower() == "resources") or (subsection_name and subsection_name.lower() == "resources"):
         target["links"] = _parse_links(text)
-        logger.info(f"Auto-detected 'Resources' section or subsection, parsed {len(target['links'])} links", 
-                   extra={"status": "parsed_links"})
+        logger.debug("Auto-detected 'Resources' section or subsection, parsed %d links", len(target['links']),
+                     extra={"status": "parsed_links"})
         return
 
     if mode == "description":
         target["description"] = text
     elif mode == "bullets":
         target["bullets"] = _parse_bullets(text)
-        logger.info(f"Parsed bullets block with {len(target['bullets'])} bullets", 
-                   extra={"status": "parsed_bullets"})
+        logger.debug("Parsed bullets block with %d bullets", len(target['bullets']),
+                     extra={"status": "parsed_bullets"})
     elif mode == "links":
         target["links"] = _parse_links(text)
-        logger.info(f"Parsed links block with {len(target['links'])} links", 
-                   extra={"status": "parsed_links"})
+        logger.debug("Parsed links block with %d links", len(target['links']),
+                     extra={"status": "parsed_links"})
     elif mode == "flags":
         target["flags"] = _parse_flags(text)
-        logger.info(f"Parsed flags block with {len(target['flags'])} flags", 
-                   extra={"status": "parsed_flags"})
+        logger.debug("Parsed flags block with %d flags", len(target['flags']),
+                     extra={"status": "parsed_flags"})
     elif mode == "commands":
         target["commands"] = _parse_commands(text)
-        logger.info(f"Parsed commands block with {len(target['commands'])} commands", 
-                   extra={"status": "parsed_commands"})
+        logger.debug("Parsed commands block with %d commands", len(target['commands']),
+                     extra={"status": "parsed_commands"})
     else:
         if "description" in target and target["description"]:
             target["description"] += "\n" + text
@@ -180,14 +211,12 @@ def _parse_commands(text):
 
 def _parse_bullets(text):
     bullets = []
-    pattern = r'-\s+`([^`]+)`:\s*(.*)'
-
     for line in text.split('\n'):
         stripped = line.strip()
         if not stripped:
             continue
             
-        match = re.match(pattern, stripped)
+        match = BULLET_RE.match(stripped)
         if match:
             bullets.append({"label": match.group(1), "description": match.group(2)})
         elif stripped.startswith('- '):
@@ -197,14 +226,12 @@ def _parse_bullets(text):
 
 def _parse_links(text):
     links = []
-    pattern = r'-\s+\[([^\]]+)\]\(([^)]+)\)'
-
     for line in text.split('\n'):
         stripped = line.strip()
         if not stripped:
             continue
             
-        match = re.match(pattern, stripped)
+        match = LINK_RE.match(stripped)
         if match:
             links.append({"text": match.group(1), "url": match.group(2)})
     return links
@@ -224,44 +251,310 @@ def save_markdown_json(data, output_file):
         })
         return None
 
+VALIDATION_MODES = ["all", "sample", "off"]
+# Fraction of notes validated with --validate sample
+VALIDATE_SAMPLE_RATE = 0.1
+
 def get_json_schema():
+    named_text = lambda value_key, value_schema: {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"name": {"type": "string"}, value_key: value_schema},
+            "required": ["name", value_key],
+            "additionalProperties": False
+        }
+    }
+    block_properties = {
+        "description": {"type": "string"},
+        "code_blocks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"language": {"type": ["string", "null"]}, "content": {"type": "string"}},
+                "required": ["language", "content"],
+                "additionalProperties": False
+            }
+        },
+        "commands": named_text("description", {"type": "string"}),
+        "flags": named_text("value", {"type": ["string", "boolean"]}),
+        "bullets": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"label": {"type": "string"}, "description": {"type": "string"}},
+                "required": ["label", "description"],
+                "additionalProperties": False
+            }
+        },
+        "links": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"text": {"type": "string"}, "url": {"type": "string"}},
+                "required": ["text", "url"],
+                "additionalProperties": False
+            }
+        }
+    }
+    subsection = {"type": "object", "properties": block_properties, "additionalProperties": False}
+    section = {
+        "type": "object",
+        "properties": dict(block_properties, sections={"type": "object", "additionalProperties": subsection}),
+        "required": ["description", "sections"],
+        "additionalProperties": False
+    }
     return {
         "type": "object",
         "properties": {
             "frontmatter": {"type": "object"},
-            "structure": {"type": "object"}
+            "structure": {"type": "object", "additionalProperties": section}
         },
         "required": ["frontmatter", "structure"]
     }
 
-def validate_json(data):
+_validator_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _build_validator():
+    # jsonschema is the slowest import of the tool, only runs that validate something load it
+    import jsonschema
     schema = get_json_schema()
-    jsonschema.validate(instance=data, schema=schema)
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
 
-def file_exists_for(md, output_dir):
+def get_validator():
+    # Schema is checked and the validator built once per process, not once per note.
+    # The lock keeps pool threads that start together from each building their own.
+    with _validator_lock:
+        return _build_validator()
+
+def validate_json(data):
+    get_validator().validate(data)
+
+def should_validate():
+    # Read from the environment so worker processes follow the CLI's --validate too
+    mode = os.environ.get("VALIDATE", "all")
+    if mode == "off":
+        return False
+    if mode == "sample":
+        return random.random() < VALIDATE_SAMPLE_RATE
+    return True
+
+OUTPUT_LAYOUTS = ["flat", "mirror", "hashed"]
+
+def json_path_for(md, output_dir, layout="flat", root=None):
+    """Output path of md: <name>.json (flat), the vault tree under output_dir (mirror),
+    or ab/cd/<hash>-<name>.json from a hash of the note's path (hashed).
+
+    mirror needs the vault root; notes outside of it fall back to hashed.
+    """
     base_name = os.path.basename(md)
     file_name = os.path.splitext(base_name)[0]
-    json_path = os.path.join(output_dir, f"{file_name}.json")
+    if layout == "flat":
+        return os.path.join(output_dir, f"{file_name}.json")
+    if layout == "mirror" and root:
+        rel = os.path.relpath(os.path.abspath(md), os.path.abspath(root))
+        if rel != os.pardir and not rel.startswith(os.pardir + os.sep):
+            return os.path.join(output_dir, f"{os.path.splitext(rel)[0]}.json")
+    # Two hex levels keep every folder small (65536 buckets), the name keeps files recognizable
+    digest = hashlib.sha1(os.path.abspath(md).encode('utf-8')).hexdigest()
+    return os.path.join(output_dir, digest[:2], digest[2:4], f"{digest[:16]}-{file_name}.json")
+
+def file_exists_for(md, output_dir):
+    json_path = json_path_for(md, output_dir)
     return os.path.exists(json_path), json_path
 
-def save_combined_json(frontmatter, structure, file_path, output_dir, dry_run=False, pretty=False):
-    os.makedirs(output_dir, exist_ok=True)
-    base_name = os.path.basename(file_path)
-    file_name = os.path.splitext(base_name)[0]
-    json_path = os.path.join(output_dir, f"{file_name}.json")
+def _is_valid(data, file_path):
+    # Deferred like the validator, runs with --validate off never import jsonschema
+    from jsonschema import ValidationError
+    try:
+        with phase_timings.phase("validation", file_path):
+            validate_json(data)
+    except ValidationError as ve:
+        location = "/".join(str(part) for part in ve.absolute_path)
+        logger.error(f"Validation failed for {file_path}", extra={"status": "validation_failed", "file_name": file_path, "error_details": f"{ve.message} at /{location}"})
+        return False
+    return True
+
+def build_combined(frontmatter, structure, file_path, validate=None):
+    # validate=None follows --validate (VALIDATE), the library API passes it explicitly
     combined = {
         "frontmatter": frontmatter,
         "structure": structure
     }
+    if validate is None:
+        validate = should_validate()
+    if validate and not _is_valid(combined, file_path):
+        return None
+    return combined
+
+def dumps_combined(combined, pretty=False):
+    if pretty:
+        text = json.dumps(combined, ensure_ascii=False, cls=SafeEncoder, indent=2)
+    else:
+        text = json.dumps(combined, ensure_ascii=False, cls=SafeEncoder, separators=(',', ':'))
+    return text.encode('utf-8')
+
+def write_if_changed(payload, json_path, dry_run=False):
+    """Write payload to json_path atomically, unless the file already holds exactly these bytes.
+
+    Returns "written" or "unchanged" (what would happen, on a dry run), None when the write failed.
+    """
     try:
-        validate_json(combined)
-    except jsonschema.ValidationError as ve:
-        logger.error(f"Validation failed for {file_path}", extra={"status": "validation_failed", "file_name": file_path, "error_details": str(ve)})
+        if os.path.getsize(json_path) == len(payload):
+            with open(json_path, 'rb') as f:
+                if f.read() == payload:
+                    return "unchanged"
+    except FileNotFoundError:
+        pass
+    if dry_run:
+        return "written"
+    tmp_path = f"{json_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, json_path)
+        return "written"
+    except OSError as e:
+        logger.error(f"Error saving JSON to {json_path}", extra={
+            "status": "error_saving_json",
+            "error_type": type(e).__name__,
+            "error_details": str(e)
+        })
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+class StreamingJsonWriter:
+    """write_if_changed for output produced piece by piece: written to a temp file while being
+    compared with the current output, so neither side is ever held in memory whole.
+    """
+
+    def __init__(self, json_path, dry_run=False):
+        self.json_path = json_path
+        self.dry_run = dry_run
+        self.tmp_path = f"{json_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self.existing = open(json_path, 'rb')
+        except FileNotFoundError:
+            self.existing = None
+        self.same = self.existing is not None
+        self.out = None if dry_run else open(self.tmp_path, 'wb')
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        if self.same:
+            self.same = self.existing.read(len(data)) == data
+        if self.out is not None:
+            self.out.write(data)
+
+    def _close(self):
+        if self.existing is not None:
+            self.existing.close()
+        if self.out is not None:
+            self.out.close()
+
+    def commit(self):
+        """Returns "written" or "unchanged", like write_if_changed."""
+        same = self.same and self.existing.read(1) == b''
+        self._close()
+        if self.dry_run:
+            return "unchanged" if same else "written"
+        if same:
+            os.remove(self.tmp_path)
+            return "unchanged"
+        os.replace(self.tmp_path, self.json_path)
+        return "written"
+
+    def abort(self):
+        self._close()
+        if self.out is not None and os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+def _indented(text, spaces):
+    return text.replace("\n", "\n" + " " * spaces)
+
+def stream_combined_json(doc, frontmatter, json_path, pretty=False, dry_run=False):
+    """Parse doc's body line by line and write each finished section straight to json_path.
+
+    The bytes are the same as write_combined_json's, but only one section is in memory at a time.
+    Returns "written" or "unchanged", None when the note failed (logged), or "fallback" for a
+    note with a repeated section title, which only the in-memory path can merge.
+    """
+    file_path = doc.path
+    if pretty:
+        dumps = lambda obj: json.dumps(obj, ensure_ascii=False, cls=SafeEncoder, indent=2)
+        head = '{\n  "frontmatter": ' + _indented(dumps(frontmatter), 2) + ',\n  "structure": {'
+        item = lambda first, title, section: ("\n" if first else ",\n") + "    " + dumps(title) + ": " + _indented(dumps(section), 4)
+        tail = "\n  }\n}"
+    else:
+        dumps = lambda obj: json.dumps(obj, ensure_ascii=False, cls=SafeEncoder, separators=(',', ':'))
+        head = '{"frontmatter":' + dumps(frontmatter) + ',"structure":{'
+        item = lambda first, title, section: ("" if first else ",") + dumps(title) + ":" + dumps(section)
+        tail = "}}"
+    # Decided once per note, so --validate sample checks all of a note or none of it
+    validate = should_validate()
+    if validate and not _is_valid({"frontmatter": frontmatter, "structure": {}}, file_path):
+        return None
+
+    logger.info(f"Processing markdown file {file_path}", extra={"status": "start_processing"})
+    try:
+        writer = StreamingJsonWriter(json_path, dry_run=dry_run)
+    except OSError as e:
+        logger.error(f"Error saving JSON to {json_path}", extra={
+            "status": "error_saving_json",
+            "error_type": type(e).__name__,
+            "error_details": str(e)
+        })
+        return None
+    titles = set()
+    try:
+        writer.write(head)
+        for title, section in iter_markdown_sections(doc.iter_body_lines()):
+            if title in titles:
+                writer.abort()
+                return "fallback"
+            titles.add(title)
+            if validate and not _is_valid({"frontmatter": {}, "structure": {title: section}}, file_path):
+                writer.abort()
+                return None
+            writer.write(item(len(titles) == 1, title, section))
+        if not titles:
+            # Same as an empty structure on the in-memory path: nothing worth writing
+            writer.abort()
+            return None
+        writer.write(tail)
+        status = writer.commit()
+    except OSError as e:
+        writer.abort()
+        logger.error(f"Error saving JSON to {json_path}", extra={
+            "status": "error_saving_json",
+            "error_type": type(e).__name__,
+            "error_details": str(e)
+        })
+        return None
+    except Exception as e:
+        writer.abort()
+        logger.error(f"Error parsing markdown file: {file_path}", extra={
+            "status": "error_processing",
+            "error_type": type(e).__name__,
+            "error_details": str(e)
+        })
+        return None
+    logger.info(f"Finished processing markdown file {file_path}", extra={"status": "finished_processing"})
+    return status
+
+def write_combined_json(combined, json_path, pretty=False, dry_run=False):
+    return write_if_changed(dumps_combined(combined, pretty=pretty), json_path, dry_run=dry_run)
+
+def save_combined_json(frontmatter, structure, file_path, output_dir, dry_run=False, pretty=False):
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = json_path_for(file_path, output_dir)
+    combined = build_combined(frontmatter, structure, file_path)
+    if combined is None:
+        return None
+    if write_combined_json(combined, json_path, pretty=pretty, dry_run=dry_run) is None:
         return None
-    if not dry_run:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            if pretty:
-                json.dump(combined, f, ensure_ascii=False, cls=SafeEncoder, indent=2)
-            else:
-                json.dump(combined, f, ensure_ascii=False, cls=SafeEncoder, separators=(',', ':'))
     return json_path
@@ -0,0 +1,154 @@
+import time
+import threading
+from concurrent.futures import wait, FIRST_COMPLETED
+
+def _bound(max_inflight):
+    # An int, or an AdaptiveLimit whose limit moves during the run
+    return getattr(max_inflight, "limit", max_inflight)
+
+def iter_bounded(executor, fn, items, max_inflight):
+    """Yield fn(item) for each item, run on executor, in completion order.
+
+    items is consumed lazily, with at most max_inflight submitted and not yet yielded: an upstream
+    generator (the vault scan) keeps producing while the workers run, and a consumer that stops
+    pulling stops the submissions too. max_inflight is re-read before every submission.
+    """
+    pending = set()
+    try:
+        for item in items:
+            while len(pending) >= _bound(max_inflight):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(fn, item))
+            # Hand over whatever already finished, so results don't pile up behind the scan
+            done = {future for future in pending if future.done()}
+            if done:
+                pending -= done
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        raise
+
+def run_bounded(executor, fn, items, max_inflight, handle):
+    """Feed fn(item) to executor as items arrive, with at most max_inflight submitted and unhandled.
+
+    handle(result) runs in the caller's thread, which makes it the single writer for indexes,
+    manifest and bundles; while it runs, nothing new is submitted.
+    """
+    results = iter_bounded(executor, fn, items, max_inflight)
+    try:
+        for result in results:
+            handle(result)
+    finally:
+        results.close()
+
+class AdaptiveLimit:
+    """In-flight bound for iter_bounded that follows the throughput measured during the run.
+
+    Workers report each item with observe(seconds, nbytes). Once a window is complete (enough
+    items and WINDOW_SEC), the limit takes one step within [minimum, maximum], hill climbing on
+    items/sec: keep going while throughput improves, turn around when it drops, and step down
+    when more in flight buys nothing (same throughput with fewer threads, less contention).
+    On a high-latency mount that means growing until the latency is hidden; on a fast disk,
+    settling low.
+    """
+
+    WINDOW_SEC = 0.25
+    # Throughput changes within this ratio count as noise
+    TOLERANCE = 0.05
+    MAX_DECISIONS = 200
+
+    def __init__(self, minimum=2, maximum=32, initial=4):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.decisions = []
+        self.changes = 0
+        self._direction = 1
+        self._previous = None
+        self._window = []
+        self._window_bytes = 0
+        self._latencies = []
+        self._bytes = 0
+        self._started = time.monotonic()
+        self._window_start = self._started
+        self._lowest = self._highest = self.limit
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, nbytes=0):
+        with self._lock:
+            self._window.append(seconds)
+            self._window_bytes += nbytes
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            if len(self._window) < max(8, 2 * self.limit) or elapsed < self.WINDOW_SEC:
+                return
+            self._window.sort()
+            latency = self._window[len(self._window) // 2]
+            self._adjust(len(self._window) / elapsed, latency, self._window_bytes / elapsed, now)
+            self._latencies.extend(self._window)
+            self._bytes += self._window_bytes
+            self._window = []
+            self._window_bytes = 0
+            self._window_start = now
+
+    def _adjust(self, throughput, latency, bytes_per_sec, now):
+        if self._previous is None:
+            reason = "probe"
+        else:
+            previous_throughput, previous_latency = self._previous
+            if throughput > previous_throughput * (1 + self.TOLERANCE):
+                reason = "throughput up"
+            elif throughput < previous_throughput * (1 - self.TOLERANCE):
+                reason = "throughput down"
+                self._direction = -self._direction
+            else:
+                reason = "latency up, no gain" if latency > previous_latency * 1.5 else "no gain"
+                self._direction = -1
+        self._previous = (throughput, latency)
+        if self._direction > 0:
+            limit = min(self.maximum, max(self.limit + 1, int(self.limit * 1.5)))
+        else:
+            limit = max(self.minimum, min(self.limit - 1, int(self.limit * 0.75)))
+        if limit == self.limit:
+            # Pinned at a bound: stay there until the throughput says otherwise
+            return
+        self.changes += 1
+        if len(self.decisions) < self.MAX_DECISIONS:
+            self.decisions.append({
+                "at_sec": round(now - self._started, 2),
+                "from": self.limit,
+                "to": limit,
+                "files_per_sec": round(throughput, 1),
+                "mb_per_sec": round(bytes_per_sec / (1024 * 1024), 2),
+                "read_p50_ms": round(latency * 1000, 2),
+                "reason": reason
+            })
+        self.limit = limit
+        self._lowest = min(self._lowest, limit)
+        self._highest = max(self._highest, limit)
+
+    def summary(self):
+        with self._lock:
+            latencies = sorted(self._latencies + self._window)
+            elapsed = time.monotonic() - self._started
+            return {
+                "min": self.minimum,
+                "max": self.maximum,
+                "final": self.limit,
+                "lowest": self._lowest,
+                "highest": self._highest,
+                "changes": self.changes,
+                "files": len(latencies),
+                "files_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0,
+                "mb_per_sec": round((self._bytes + self._window_bytes) / elapsed / (1024 * 1024), 2) if elapsed else 0,
+                "read_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else 0,
+                "decisions": self.decisions
+            }
@@ -0,0 +1,58 @@
+import os
+import json
+import sqlite3
+import argparse
+from services.search_index import INDEX_NAME, KINDS, search
+
+def _location(row):
+    if row["subsection"]:
+        return f"{row['section']} › {row['subsection']}"
+    return row["section"] or "frontmatter"
+
+def _preview(row, width=100):
+    text = row["snippet"] or row["value"] or ""
+    text = " ".join(text.split())
+    if row["name"] and row["kind"] != "section":
+        text = f"{row['name']}: {text}" if text else row["name"]
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m obsidian-to-json search", description="Query the search index built with --search-index.")
+    parser.add_argument('query', nargs='?', default=None, help='FTS5 query, e.g. "gcloud init", \'"gcloud init"\' for the exact phrase, kube*')
+    parser.add_argument('--kind', type=str, default=None, choices=KINDS, help='Only entries of this kind.')
+    parser.add_argument('--section', type=str, default=None, help='Only entries under this section or subsection title.')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum number of results. Default: 20')
+    parser.add_argument('--files', action='store_true', help='Only list the matching notes.')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON Lines.')
+    parser.add_argument('--db', type=str, default=None, help='Index database. Default: OUTPUT_FOLDER/obsidian-to-json.sqlite')
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(os.getenv("OUTPUT_FOLDER") or "output", INDEX_NAME)
+    if not os.path.exists(db_path):
+        print(f" ❌ No search index at {db_path}, run the converter with --search-index first")
+        return 1
+    if not args.query and not args.kind and not args.section:
+        parser.error("give a query, --kind or --section")
+
+    try:
+        rows = search(db_path, args.query, kind=args.kind, section=args.section, limit=args.limit)
+    except sqlite3.DatabaseError as e:
+        # A malformed FTS5 query (unbalanced quote, bare operator) lands here too
+        print(f" ❌ Search failed: {e}")
+        return 1
+    if args.files:
+        seen = []
+        for row in rows:
+            if row["path"] not in seen:
+                seen.append(row["path"])
+        rows = [{"path": path} for path in seen]
+        if not args.json:
+            for path in seen:
+                print(path)
+    if args.json:
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+    elif not args.files:
+        for row in rows:
+            print(f"{row['path']}\n    [{row['kind']}] {_location(row)}: {_preview(row)}")
+    return 0
@@ -0,0 +1,155 @@
+import os
+import json
+import sqlite3
+from services.markdown_to_json import SafeEncoder
+from utils.logger import logger
+
+INDEX_NAME = "obsidian-to-json.sqlite"
+SCHEMA_VERSION = 1
+KINDS = ["frontmatter", "section", "description", "command", "flag", "bullet", "link", "code"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    path TEXT PRIMARY KEY,
+    sha256 TEXT,
+    frontmatter TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    section TEXT,
+    subsection TEXT,
+    name TEXT,
+    value TEXT,
+    language TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_path ON entries(path);
+CREATE INDEX IF NOT EXISTS entries_kind ON entries(kind, section);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(name, value, content='entries', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, name, value) VALUES (new.id, new.name, new.value);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, name, value) VALUES ('delete', old.id, old.name, old.value);
+END;
+"""
+
+def _text(value):
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, cls=SafeEncoder)
+
+def _block_rows(block, section, subsection):
+    if block.get("description"):
+        yield "description", section, subsection, None, block["description"], None
+    for command in block.get("commands", []):
+        yield "command", section, subsection, command["name"], command["description"], None
+    for flag in block.get("flags", []):
+        yield "flag", section, subsection, flag["name"], _text(flag["value"]), None
+    for bullet in block.get("bullets", []):
+        yield "bullet", section, subsection, bullet["label"], bullet["description"], None
+    for link in block.get("links", []):
+        yield "link", section, subsection, link["text"], link["url"], None
+    for code in block.get("code_blocks", []):
+        yield "code", section, subsection, None, code["content"], code["language"]
+
+def note_rows(combined):
+    """Flatten a converted note into (kind, section, subsection, name, value, language) rows."""
+    for key, value in combined["frontmatter"].items():
+        yield "frontmatter", None, None, key, _text(value), None
+    for title, section in combined["structure"].items():
+        yield "section", title, None, title, None, None
+        yield from _block_rows(section, title, None)
+        for subtitle, subsection in section.get("sections", {}).items():
+            yield "section", title, subtitle, subtitle, None, None
+            yield from _block_rows(subsection, title, subtitle)
+
+class SearchIndex:
+    """SQLite + FTS5 index of every converted note, rewritten note by note as they change."""
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, INDEX_NAME)
+        os.makedirs(output_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        # Readers (the search CLI, a dashboard) keep working while a run writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS entries_fts; DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS notes;")
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._current = dict(self.conn.execute("SELECT path, sha256 FROM notes"))
+        self.updated = 0
+        self.removed = 0
+
+    def is_current(self, md, sha256):
+        return self._current.get(os.path.abspath(md)) == sha256
+
+    def update(self, md, combined, sha256):
+        key = os.path.abspath(md)
+        self.conn.execute("DELETE FROM entries WHERE path = ?", (key,))
+        self.conn.executemany(
+            "INSERT INTO entries (path, kind, section, subsection, name, value, language) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((key,) + row for row in note_rows(combined))
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO notes (path, sha256, frontmatter) VALUES (?, ?, ?)",
+            (key, sha256, _text(combined["frontmatter"]))
+        )
+        self._current[key] = sha256
+        self.updated += 1
+
+    def remove(self, md):
+        key = os.path.abspath(md)
+        self.conn.execute("DELETE FROM entries WHERE path = ?", (key,))
+        self.conn.execute("DELETE FROM notes WHERE path = ?", (key,))
+        if self._current.pop(key, None) is not None:
+            self.removed += 1
+
+    def commit(self):
+        self.conn.commit()
+        if self.updated or self.removed:
+            logger.info(f"Search index: {self.updated} notes updated, {self.removed} removed", extra={
+                "status": "search_index",
+                "destination_path": self.path
+            })
+        self.updated = self.removed = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def search(db_path, query=None, kind=None, section=None, limit=20):
+    """Matching entries as dicts, best FTS rank first (or in note order when there's no query)."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        filters, params = [], []
+        if kind:
+            filters.append("e.kind = ?")
+            params.append(kind)
+        if section:
+            filters.append("(e.section = ? COLLATE NOCASE OR e.subsection = ? COLLATE NOCASE)")
+            params += [section, section]
+        if query:
+            sql = (
+                "SELECT e.path, e.kind, e.section, e.subsection, e.name, e.value, e.language, "
+                "snippet(entries_fts, 1, '[', ']', '…', 16) AS snippet "
+                "FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid WHERE entries_fts MATCH ?"
+            )
+            params.insert(0, query)
+            order = "rank"
+        else:
+            sql = (
+                "SELECT e.path, e.kind, e.section, e.subsection, e.name, e.value, e.language, NULL AS snippet "
+                "FROM entries e WHERE 1"
+            )
+            order = "e.path, e.id"
+        for condition in filters:
+            sql += f" AND {condition}"
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
@@ -0,0 +1,169 @@
+import os
+import json
+import glob
+import zlib
+import threading
+from services.markdown_to_json import SafeEncoder, json_path_for, write_combined_json, stream_combined_json
+from utils.logger import logger
+
+BUNDLE_NAME = "obsidian-to-json"
+
+class JsonFileSink:
+    """One .json per note, flat in the output folder (the original layout), mirroring the vault or hash-sharded."""
+
+    # Output belongs to a single note, so it can be deleted with the note
+    per_note_outputs = True
+    # Workers can write it themselves
+    collect_in_parent = False
+
+    def __init__(self, output_dir, dry_run=False, pretty=False, layout="flat", root=None, stream_threshold=None):
+        self.output_dir = output_dir
+        self.dry_run = dry_run
+        self.pretty = pretty
+        self.layout = layout
+        self.root = root
+        # Notes with a body of at least this many bytes are streamed section by section (None: never)
+        self.stream_threshold = stream_threshold
+
+    def target_for(self, md):
+        return json_path_for(md, self.output_dir, layout=self.layout, root=self.root)
+
+    def emit(self, md, combined):
+        """Returns (output path, "written" | "unchanged"), or (None, "failed")."""
+        json_path = self.target_for(md)
+        if not self.dry_run:
+            os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        status = write_combined_json(combined, json_path, pretty=self.pretty, dry_run=self.dry_run)
+        if status is None:
+            return None, "failed"
+        return json_path, status
+
+    def streams(self, doc):
+        start, end = doc.body_span
+        return self.stream_threshold is not None and end - start >= self.stream_threshold
+
+    def stream(self, doc, frontmatter):
+        """emit() without building the note in memory, or (None, "fallback") when it can't be streamed."""
+        json_path = self.target_for(doc.path)
+        if not self.dry_run:
+            os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        status = stream_combined_json(doc, frontmatter, json_path, pretty=self.pretty, dry_run=self.dry_run)
+        if status is None:
+            return None, "failed"
+        if status == "fallback":
+            return None, "fallback"
+        return json_path, status
+
+    def keep(self, md):
+        pass
+
+    def finalize(self):
+        pass
+
+    def abort(self):
+        pass
+
+class JsonlSink:
+    """Streams every note into one (or N sharded) .jsonl bundle, swapped in atomically at the end of the run."""
+
+    per_note_outputs = False
+    # A worker process can't share the open bundle, it sends the encoded line back instead
+    collect_in_parent = True
+
+    def __init__(self, output_dir, shards=1, dry_run=False):
+        self.output_dir = output_dir
+        self.shards = max(1, shards)
+        self.dry_run = dry_run
+        self.paths = [self._shard_path(i) for i in range(self.shards)]
+        self._files = {}
+        self._kept = set()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_files"] = {}
+        state["_lock"] = None
+        return state
+
+    def _shard_path(self, index):
+        if self.shards == 1:
+            return os.path.join(self.output_dir, f"{BUNDLE_NAME}.jsonl")
+        return os.path.join(self.output_dir, f"{BUNDLE_NAME}-{index:02d}-of-{self.shards:02d}.jsonl")
+
+    def _shard_of(self, md):
+        return zlib.crc32(os.path.abspath(md).encode('utf-8')) % self.shards
+
+    def target_for(self, md):
+        return self.paths[self._shard_of(md)]
+
+    def streams(self, doc):
+        # A record is one line of the bundle, it is always built whole
+        return False
+
+    def encode(self, md, combined):
+        record = {"path": os.path.abspath(md)}
+        record.update(combined)
+        return json.dumps(record, ensure_ascii=False, cls=SafeEncoder, separators=(',', ':'))
+
+    def append(self, md, line):
+        index = self._shard_of(md)
+        if self.dry_run:
+            return self.paths[index]
+        with self._lock:
+            f = self._files.get(index)
+            if f is None:
+                os.makedirs(self.output_dir, exist_ok=True)
+                f = self._files[index] = open(f"{self.paths[index]}.tmp", 'w', encoding='utf-8')
+            f.write(line)
+            f.write("\n")
+        return self.paths[index]
+
+    def emit(self, md, combined):
+        return self.append(md, self.encode(md, combined)), "written"
+
+    def keep(self, md):
+        # Unchanged note: its record is carried over from the previous bundle at finalize time
+        with self._lock:
+            self._kept.add(os.path.abspath(md))
+
+    def _carry_over(self):
+        decoder = json.JSONDecoder()
+        prefix = '{"path":'
+        pattern = os.path.join(self.output_dir, f"{BUNDLE_NAME}*.jsonl")
+        for old_path in sorted(glob.glob(pattern)):
+            with open(old_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.startswith(prefix):
+                        continue
+                    path, _ = decoder.raw_decode(line, len(prefix))
+                    if path in self._kept:
+                        self.append(path, line.rstrip("\n"))
+
+    def finalize(self):
+        if self.dry_run:
+            return
+        if self._kept:
+            self._carry_over()
+        with self._lock:
+            for index, path in enumerate(self.paths):
+                f = self._files.pop(index, None)
+                if f is None:
+                    # Nothing landed in this shard, it still has to exist (and be empty) after the run
+                    f = open(f"{path}.tmp", 'w', encoding='utf-8')
+                f.close()
+                os.replace(f"{path}.tmp", path)
+        # Bundles from a previous run with another shard count would be stale now
+        for old_path in glob.glob(os.path.join(self.output_dir, f"{BUNDLE_NAME}*.jsonl")):
+            if old_path not in self.paths:
+                os.remove(old_path)
+        logger.info(f"Bundle written to {len(self.paths)} shard(s)", extra={
+            "status": "bundle_written",
+            "destination_path": self.output_dir
+        })
+
+    def abort(self):
+        with self._lock:
+            for index, f in list(self._files.items()):
+                f.close()
+                os.remove(f"{self.paths[index]}.tmp")
+            self._files = {}
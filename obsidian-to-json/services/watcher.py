@@ -0,0 +1,197 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from services.discovery import PathFilter, scan_vault
+from utils.logger import logger
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+def _load_libc():
+    name = ctypes.util.find_library("c")
+    if not name:
+        return None
+    libc = ctypes.CDLL(name, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+def is_fuse_mount(path):
+    """True when path lives on a FUSE filesystem, where inotify misses remote changes."""
+    path = os.path.realpath(path)
+    best, fstype = "", ""
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount_point = parts[1].replace("\\040", " ")
+                if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) > len(best):
+                    best, fstype = mount_point, parts[2]
+    except OSError:
+        return False
+    return fstype.startswith("fuse")
+
+class InotifyWatcher:
+    """Recursive inotify watch over the vault, through libc via ctypes (no extra dependency)."""
+
+    def __init__(self, folder, libc, path_filter=None):
+        self.folder = folder
+        self.libc = libc
+        self.path_filter = path_filter or PathFilter()
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        self._add_tree(folder)
+
+    def _add_dir(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.warning("inotify watch limit reached, raise fs.inotify.max_user_watches", extra={"status": "watch_limit"})
+            return
+        self.dirs[wd] = path
+
+    def _add_tree(self, root):
+        changed = set()
+        if self.path_filter.prune_path(root, self.folder):
+            return changed
+        for current, dirs, files in os.walk(root):
+            self._add_dir(current)
+            # Excluded folders (.obsidian & co) get no watch at all
+            dirs[:] = [name for name in dirs if not self.path_filter.prune_path(os.path.join(current, name), self.folder)]
+            changed.update(
+                path for path in (os.path.join(current, name) for name in files)
+                if self.path_filter.accept_path(path, self.folder)
+            )
+        return changed
+
+    def poll(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                raw_name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length]
+                offset += EVENT_HEADER.size + length
+                name = os.fsdecode(raw_name.rstrip(b"\0"))
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped, the caller has to rescan everything it knows about
+                    logger.warning("inotify queue overflow, rescanning vault", extra={"status": "watch_overflow"})
+                    changed.update(self._add_tree(self.folder))
+                    continue
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                parent = self.dirs.get(wd)
+                if parent is None or not name:
+                    continue
+                path = os.path.join(parent, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # New or moved-in folder: watch it and treat its notes as changed
+                        changed.update(self._add_tree(path))
+                    elif mask & IN_MOVED_FROM:
+                        # Folder moved out of the vault: report it so the batch prunes its notes
+                        changed.add(path)
+                    continue
+                if self.path_filter.accept_path(path, self.folder):
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for FUSE mounts (Google Drive & co) and systems without inotify: compares stat snapshots."""
+
+    def __init__(self, folder, interval=2.0, path_filter=None):
+        self.folder = folder
+        self.interval = interval
+        self.path_filter = path_filter
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for entry in scan_vault(self.folder, path_filter=self.path_filter):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        current = self._scan()
+        changed = {path for path, sig in current.items() if self.snapshot.get(path) != sig}
+        changed.update(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+def create_watcher(folder, mode="auto", poll_interval=2.0, path_filter=None):
+    libc = _load_libc() if mode in ("auto", "inotify") else None
+    if mode == "inotify" and libc is None:
+        raise OSError("inotify is not available on this system")
+    if libc is not None and (mode == "inotify" or not is_fuse_mount(folder)):
+        try:
+            return InotifyWatcher(folder, libc, path_filter=path_filter)
+        except OSError as e:
+            if mode == "inotify":
+                raise
+            logger.warning("inotify unavailable, falling back to polling", extra={
+                "status": "watch_fallback",
+                "error_type": type(e).__name__,
+                "error_details": str(e)
+            })
+    return PollingWatcher(folder, interval=poll_interval, path_filter=path_filter)
+
+def watch_vault(folder, on_change, mode="auto", debounce=0.5, poll_interval=2.0, path_filter=None):
+    """Call on_change(paths) with each debounced burst of changed/deleted note paths, until interrupted."""
+    watcher = create_watcher(folder, mode=mode, poll_interval=poll_interval, path_filter=path_filter)
+    logger.info(f"Watching {folder} with {type(watcher).__name__}", extra={"status": "watch_started", "destination_path": folder})
+    try:
+        while True:
+            pending = watcher.poll(None)
+            if not pending:
+                continue
+            # Obsidian saves in bursts while typing, wait for a quiet gap before converting
+            while True:
+                more = watcher.poll(debounce)
+                if not more:
+                    break
+                pending |= more
+            on_change(pending)
+    finally:
+        watcher.close()
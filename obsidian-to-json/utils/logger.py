@@ -1,23 +1,31 @@
 import logging
+import re
 import json
+import calendar
 import socket
 import os
 import uuid
+import time
+import queue
+import random
+import atexit
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from dotenv import load_dotenv
-
-load_dotenv()
-os.makedirs("output", exist_ok=True)
 
 # Static configuration
 HOSTNAME = socket.gethostname()
 APP_NAME = "obsidian-to-json"
-EXECUTION_ID = str(uuid.uuid4())
+LOG_FILE = "output/obsidian-to-json.log"
+# Rotated segments: obsidian-to-json.log.<first>-<last>.gz, UTC times of their first and last record
+ARCHIVE_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+# Set by setup_logging and exported so worker processes log under the same run
+EXECUTION_ID = None
 
-# Configure logger
+# Importing the logger configures nothing: the CLI calls setup_logging, embedding code
+# (services.api) gets a library logger it can route with the standard logging config
 logger = logging.getLogger(APP_NAME)
-logger.setLevel(logging.DEBUG)
-handler = logging.FileHandler("output/obsidian-to-json.log")
+logger.addHandler(logging.NullHandler())
 
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -34,7 +42,9 @@ class JsonFormatter(logging.Formatter):
         }
 
         # Only include optional fields if they were provided and are meaningful
-        optional_fields = ["destination_path", "duration_sec", "files_scanned", "files_indexed"]
+        optional_fields = ["destination_path", "duration_sec", "files_scanned", "files_indexed",
+                           "files_cached", "files_written", "files_unchanged", "files_failed",
+                           "phases", "slowest_files", "concurrency"]
         for field in optional_fields:
             if hasattr(record, field):
                 value = getattr(record, field)
@@ -43,13 +53,263 @@ class JsonFormatter(logging.Formatter):
 
         return json.dumps(log_data, ensure_ascii=False)
 
-handler.setFormatter(JsonFormatter())
-logger.addHandler(handler)
+def archive_name(log_file, first, last, attempt=0):
+    stamp = lambda ts: time.strftime(ARCHIVE_TIME_FORMAT, time.gmtime(ts))
+    suffix = f".{attempt}" if attempt else ""
+    return f"{log_file}.{stamp(first)}-{stamp(last)}{suffix}.gz"
+
+def log_archives(log_file=LOG_FILE):
+    """Rotated segments of log_file as (path, first, last) in epoch seconds, oldest first."""
+    folder = os.path.dirname(log_file) or "."
+    pattern = re.compile(re.escape(os.path.basename(log_file)) + r'\.(\d{8}T\d{6}Z)-(\d{8}T\d{6}Z)(?:\.(\d+))?\.gz$')
+    archives = []
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return archives
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            first, last = (calendar.timegm(time.strptime(value, ARCHIVE_TIME_FORMAT)) for value in match.groups()[:2])
+            # Segments rotated within the same second are numbered in order
+            archives.append((first, last, int(match.group(3) or 0), os.path.join(folder, name)))
+    archives.sort()
+    return [(path, first, last) for first, last, _, path in archives]
+
+class BatchingFileHandler(logging.Handler):
+    """Formats records and appends them to the log file in batches, one write per batch.
+
+    With max_bytes or max_age set, a log that grew past max_bytes or whose first record is
+    older than max_age seconds is gzipped into an archive before the next batch; only the
+    newest keep archives are kept.
+    """
+
+    def __init__(self, filename, batch_size=256, flush_interval=0.5, max_bytes=0, max_age=0, keep=0):
+        super().__init__()
+        self.filename = filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        # Off in forked workers, the parent owns the file's lifecycle
+        self.rotate = bool(max_bytes or max_age)
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        # Time of the live segment's first record, read from the file when first needed
+        self.segment_first = None
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self.buffer.append(line)
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.buffer:
+                # Created with the first batch, a run that logs nothing leaves no folder behind
+                os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+                if self.rotate:
+                    self._rotate_if_due()
+                with open(self.filename, 'a', encoding='utf-8') as f:
+                    f.write("\n".join(self.buffer) + "\n")
+                self.buffer = []
+            self.last_flush = time.monotonic()
+        finally:
+            self.release()
+
+    def _first_timestamp(self):
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                stamp = json.loads(f.readline())["timestamp"]
+            return datetime.fromisoformat(stamp.replace("Z", "+00:00")).timestamp()
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _rotate_if_due(self):
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            self.segment_first = time.time()
+            return
+        if self.segment_first is None:
+            self.segment_first = self._first_timestamp() or st.st_mtime
+        too_big = self.max_bytes and st.st_size >= self.max_bytes
+        too_old = self.max_age and time.time() - self.segment_first >= self.max_age
+        if not (too_big or too_old):
+            return
+        try:
+            self._archive(st)
+        except OSError:
+            # A failed rotation must not lose the batch, the log just keeps growing until the next try
+            pass
+
+    def _archive(self, st):
+        import gzip
+        import shutil
+        attempt = 0
+        target = archive_name(self.filename, self.segment_first, max(st.st_mtime, self.segment_first))
+        while os.path.exists(target):
+            attempt += 1
+            target = archive_name(self.filename, self.segment_first, max(st.st_mtime, self.segment_first), attempt)
+        # Moved aside first: workers appending from now on start the new segment
+        rotating = f"{self.filename}.rotating"
+        os.replace(self.filename, rotating)
+        with open(rotating, 'rb') as src, gzip.open(f"{target}.tmp", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(f"{target}.tmp", target)
+        os.remove(rotating)
+        self.segment_first = time.time()
+        if self.keep:
+            for path, _, _ in log_archives(self.filename)[:-self.keep]:
+                os.remove(path)
+
+class DeferredQueueHandler(logging.Handler):
+    """Enqueues the raw record; JSON formatting happens on the writer thread, not in the caller.
+
+    Same job as logging.handlers.QueueHandler, without importing logging.handlers at startup.
+    """
+
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+class StatusSampler(logging.Filter):
+    def __init__(self, spec):
+        super().__init__()
+        self.rates = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            status, _, rate = item.partition("=")
+            self.rates[status.strip()] = float(rate or 1)
+
+    def filter(self, record):
+        rate = self.rates.get(getattr(record, "status", None))
+        return rate is None or random.random() < rate
+
+class AsyncLogWriter:
+    """Background thread draining the log queue into the batching file handler."""
+
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, handler, flush_interval=0.5):
+        self.handler = handler
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self.handler.flush()
+                continue
+            if item is self._STOP:
+                self.handler.flush()
+                return
+            if isinstance(item, tuple) and item[0] is self._FLUSH:
+                self.handler.flush()
+                item[1].set()
+                continue
+            self.handler.handle(item)
+
+    def flush(self, timeout=5):
+        if self._thread is None or not self._thread.is_alive():
+            self.handler.flush()
+            return
+        done = threading.Event()
+        self.queue.put((self._FLUSH, done))
+        done.wait(timeout)
+
+    def stop(self):
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(self._STOP)
+            self._thread.join()
+        self.handler.flush()
+
+    def _after_fork(self):
+        # Forked workers inherit neither the thread nor a safe queue, start over with empty ones
+        self.handler.buffer = []
+        self.handler.rotate = False
+        self.queue = queue.SimpleQueue()
+        queue_handler.queue = self.queue
+        self.start()
+
+writer = None
+queue_handler = None
+_setup_lock = threading.Lock()
+
+def _start_writer():
+    global writer, queue_handler, EXECUTION_ID
+    with _setup_lock:
+        if writer is not None:
+            return
+        EXECUTION_ID = os.environ.setdefault("EXECUTION_ID", str(uuid.uuid4()))
+        flush_interval = float(os.environ.get("LOG_FLUSH_INTERVAL", "0.5"))
+        file_handler = BatchingFileHandler(
+            LOG_FILE,
+            batch_size=int(os.environ.get("LOG_BATCH_SIZE", "256")),
+            flush_interval=flush_interval,
+            max_bytes=int(os.environ.get("LOG_ROTATE_BYTES", str(10 * 1024 * 1024))),
+            max_age=float(os.environ.get("LOG_ROTATE_AGE", str(7 * 24 * 3600))),
+            keep=int(os.environ.get("LOG_ROTATE_KEEP", "20"))
+        )
+        file_handler.setFormatter(JsonFormatter())
+        started = AsyncLogWriter(file_handler, flush_interval=flush_interval)
+        queue_handler = DeferredQueueHandler(started.queue)
+        # LOG_SAMPLE="new_subsection=0.1,capture_mode=0" keeps that fraction of records per status
+        sample = os.environ.get("LOG_SAMPLE", "")
+        if sample:
+            queue_handler.addFilter(StatusSampler(sample))
+        logger.addHandler(queue_handler)
+        started.start()
+        atexit.register(started.stop)
+        os.register_at_fork(after_in_child=started._after_fork)
+        writer = started
+
+def setup_logging():
+    """Attach the JSON file handler and start the writer thread (once per process).
+
+    The CLI calls it after loading .env so that LOG_LEVEL, LOG_SAMPLE, LOG_BATCH_SIZE and
+    LOG_FLUSH_INTERVAL from the file apply; worker processes call it when they start.
+    LOG_LEVEL=DEBUG brings back the per-section parser events.
+    """
+    logger.setLevel(getattr(logging, os.environ.get("LOG_LEVEL", "INFO").upper(), logging.INFO))
+    _start_writer()
+
+def flush_logs():
+    """Block until every record queued so far is on disk."""
+    if writer is not None:
+        writer.flush()
 
 def log_processing_result(status, **additional_info):
     extra_info = {"status": status}
 
-    for key in ["duration_sec", "files_scanned", "files_indexed", "destination_path"]:
+    for key in ["duration_sec", "files_scanned", "files_indexed", "files_cached", "destination_path",
+                "files_written", "files_unchanged", "files_failed"]:
         value = additional_info.get(key)
         if value not in (None, "", 0):
             extra_info[key] = value
@@ -76,6 +336,89 @@ def log_error(error_message, exception=None, **additional_info):
 
     logger.error(error_message, extra=extra_info)
 
+FILE_RESULT_MESSAGES = {
+    "converted": "file converted with success",
+    "already_exists": "file already exists",
+    "unchanged": "file unchanged since last run",
+    "removed": "source note deleted, output removed",
+}
+
 def log_file_result(file_path, status):
-    msg = "file converted with success" if status == "converted" else "file already exists"
+    msg = FILE_RESULT_MESSAGES.get(status, status)
     logger.info(msg, extra={"status": status, "file_name": file_path})
+
+class PhaseTimings:
+    """Per-file, per-phase durations collected during the run, summarized once at the end."""
+
+    def __init__(self):
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def record(self, file_path, phase, seconds):
+        with self._lock:
+            phases = self._files.setdefault(file_path, {})
+            phases[phase] = phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase, file_path):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(file_path, phase, time.perf_counter() - start)
+
+    def pop(self, file_path):
+        # Worker processes hand their timings back to the parent with the file's result
+        with self._lock:
+            return self._files.pop(file_path, {})
+
+    def merge(self, file_path, phases):
+        for phase, seconds in phases.items():
+            self.record(file_path, phase, seconds)
+
+    def clear(self):
+        with self._lock:
+            self._files = {}
+
+    def summary(self, slowest=10):
+        with self._lock:
+            files = dict(self._files)
+        by_phase = {}
+        for phases in files.values():
+            for phase, seconds in phases.items():
+                by_phase.setdefault(phase, []).append(seconds)
+        stats = {}
+        for phase, values in by_phase.items():
+            values.sort()
+            stats[phase] = {
+                "count": len(values),
+                "total_sec": round(sum(values), 3),
+                "p50_ms": round(_percentile(values, 50) * 1000, 2),
+                "p95_ms": round(_percentile(values, 95) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2)
+            }
+        ranked = sorted(files.items(), key=lambda item: sum(item[1].values()), reverse=True)[:slowest]
+        slowest_files = [
+            {
+                "file_name": path,
+                "total_ms": round(sum(phases.values()) * 1000, 2),
+                "phases_ms": {phase: round(seconds * 1000, 2) for phase, seconds in phases.items()}
+            }
+            for path, phases in ranked
+        ]
+        return {"phases": stats, "slowest_files": slowest_files}
+
+def _percentile(sorted_values, percent):
+    # Nearest rank, good enough for a run summary
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[int(index)]
+
+phase_timings = PhaseTimings()
+
+def log_phase_timings(slowest=10):
+    """Log p50/p95/max per phase and the slowest files, then start over (watch mode logs one per batch)."""
+    summary = phase_timings.summary(slowest=slowest)
+    phase_timings.clear()
+    if summary["phases"]:
+        logger.info("Phase timings", extra={"status": "phase_timings", **summary})
+    return summary
@@ -0,0 +1,112 @@
+import os
+import io
+import sys
+import glob
+import cProfile
+import threading
+from contextlib import contextmanager
+from utils.logger import LOG_FILE, logger
+
+PROFILE_FILE = os.path.join(os.path.dirname(LOG_FILE), "obsidian-to-json.prof")
+# Set for worker processes, each batch dumps its own part file next to the profile
+PROFILE_ENV = "PROFILE_DUMP"
+TOP_FUNCTIONS = 30
+# Up to 3.11 cProfile only sees the thread that enabled it; from 3.12 on it hooks sys.monitoring,
+# which covers every thread and allows a single active profiler
+PER_THREAD = sys.version_info < (3, 12)
+
+class RunProfiler:
+    """cProfile over the main thread, the conversion threads and the worker processes of one run."""
+
+    def __init__(self, path=PROFILE_FILE):
+        self.path = path
+        self.active = False
+        self._main = None
+        self._profiles = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Leftovers of an interrupted run would end up in this profile
+        for part in glob.glob(f"{self.path}.*.part"):
+            os.remove(part)
+        self.active = True
+        os.environ[PROFILE_ENV] = self.path
+        self._main = cProfile.Profile()
+        self._main.enable()
+
+    def call(self, fn, *args):
+        # Before 3.12 cProfile only sees the thread that enabled it, so each pool thread gets its own profile
+        if not self.active or not PER_THREAD:
+            return fn(*args)
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        profile.enable()
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+
+    def detach(self):
+        """Turn off a profiler copied into a forked worker, which profiles its batches on its own."""
+        if self.active:
+            self._main.disable()
+            self.active = False
+
+    def stop(self):
+        """Write the merged profile and a top-functions summary, returns both paths."""
+        if not self.active:
+            return None
+        self._main.disable()
+        self.active = False
+        os.environ.pop(PROFILE_ENV, None)
+        import pstats
+        stats = pstats.Stats(self._main)
+        for profile in self._profiles:
+            profile.create_stats()
+            # A thread that never got to run a note has nothing to add
+            if profile.stats:
+                stats.add(profile)
+        parts = glob.glob(f"{self.path}.*.part")
+        for part in parts:
+            stats.add(part)
+            os.remove(part)
+        stats.dump_stats(self.path)
+
+        summary_path = f"{self.path}.txt"
+        buffer = io.StringIO()
+        stats.stream = buffer
+        buffer.write(f"Top {TOP_FUNCTIONS} functions by cumulative time\n")
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        buffer.write(f"\nTop {TOP_FUNCTIONS} functions by own time\n")
+        stats.sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(buffer.getvalue())
+        logger.info(f"Profile written to {self.path}", extra={
+            "status": "profile_written",
+            "destination_path": self.path
+        })
+        return self.path, summary_path
+
+@contextmanager
+def worker_profile():
+    """Profile a worker process batch when the parent runs with --profile."""
+    path = os.environ.get(PROFILE_ENV)
+    if not path:
+        yield
+        return
+    # Still enabled in a forked worker, and from 3.12 on only one profiler may be
+    profiler.detach()
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(f"{path}.{os.getpid()}.{id(profile)}.part")
+
+profiler = RunProfiler()
@@ -0,0 +1,35 @@
+import os
+import json
+from utils.logger import logger
+
+def load_state(path, version, name, status):
+    """The JSON state file at path as a dict, or None when the caller has to start from scratch.
+
+    That is when the file is missing, was written by another version, or can't be read; the
+    last two are logged as warnings with status (manifest_reset, ai_index_reset...).
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (ValueError, OSError) as e:
+        logger.warning(f"Unreadable {name} {path}, starting from scratch", extra={
+            "status": status,
+            "error_type": type(e).__name__,
+            "error_details": str(e)
+        })
+        return None
+    if not isinstance(data, dict) or data.get("version") != version:
+        logger.warning(f"Ignoring {name} with unknown version in {path}, starting from scratch", extra={"status": status})
+        return None
+    return data
+
+def save_state_atomic(path, data):
+    """Write data to path as compact JSON through a temporary file: readers see the old file or the new one."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return path